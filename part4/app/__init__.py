@@ -1,6 +1,12 @@
 from flask import Flask
-from app.extensions import db, migrate, bcrypt, jwt
+from app.extensions import db, migrate, bcrypt, jwt, response_cache, password_hasher, replica_router, compressor, asset_store, request_metrics
 from app.error_handlers import register_error_handlers
+from app.commands import register_commands
+from app.db_pool import init_pool_stats
+from app.sqlite import init_sqlite
+from app.json_provider import init_json
+from app.assets import assets_bp
+from app.metrics import metrics_bp
 from app.api.v1.users import users_bp
 from app.api.v1.places import places_bp
 from app.api.v1.reviews import reviews_bp
@@ -8,20 +14,33 @@ from app.api.v1.auth import auth_bp
 from app.api.v1.place_amenities import place_amenities_bp
 from app.api.v1.place_reviews import place_reviews_bp
 from app.api.v1.amenities import amenities_bp
+from app.api.v1.cache import cache_bp
+from app.api.v1.db import db_bp
 from flask_cors import CORS
 
 def create_app(config_class_name="DevelopmentConfig"):
-    app = Flask(__name__)
+    # /static is served by the asset store (fingerprinted, precompressed)
+    app = Flask(__name__, static_folder=None)
     # Dynamically select config class by string name (default: DevelopmentConfig)
     from app import config as app_config
     config_class = getattr(app_config, config_class_name)
     app.config.from_object(config_class)
+    init_json(app)
+    request_metrics.init_app(app)
 
     db.init_app(app)
+    init_pool_stats(app)
+    init_sqlite(app, db)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    replica_router.init_app(app)
+    compressor.init_app(app)
+    asset_store.init_app(app)
     register_error_handlers(app)
+    register_commands(app)
 
     # Enable CORS for both localhost and 127.0.0.1 (frontend dev hosts)
     CORS(app, origins=["http://localhost:5500", "http://127.0.0.1:5500"])
@@ -33,5 +52,9 @@ def create_app(config_class_name="DevelopmentConfig"):
     app.register_blueprint(place_amenities_bp)
     app.register_blueprint(place_reviews_bp)
     app.register_blueprint(amenities_bp)
+    app.register_blueprint(cache_bp)
+    app.register_blueprint(db_bp)
+    app.register_blueprint(assets_bp)
+    app.register_blueprint(metrics_bp)
 
     return app
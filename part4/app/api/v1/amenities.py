@@ -1,15 +1,22 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import db
+from flask import Blueprint, request, jsonify, abort
+from app.extensions import db, response_cache
+from app.ids import new_id
 from app.models.amenity import Amenity
-from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
+from app.conditional import validators, not_modified, with_validators
+from app.schemas import AmenitySchema
+from app.batch import BatchError, load_batch, batch_response
+from app.streaming import wants_stream, stream_query
 
 amenities_bp = Blueprint('amenities', __name__)
+amenity_batch_schema = AmenitySchema(many=True)
 
 @amenities_bp.route('/api/v1/amenities/', methods=['POST'])
 @jwt_required()
 def create_amenity():
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Admin only"}), 403
     data = request.get_json()
     if not data or 'name' not in data:
@@ -20,42 +27,98 @@ def create_amenity():
     )
     db.session.add(amenity)
     db.session.commit()
+    response_cache.invalidate('amenities')
     return jsonify({"id": amenity.id, "name": amenity.name, "description": amenity.description}), 201
 
+@amenities_bp.route('/api/v1/amenities/batch', methods=['POST'])
+@jwt_required()
+def create_amenities_batch():
+    identity = current_identity()
+    if not identity.is_admin:
+        return jsonify({"msg": "Admin only"}), 403
+    try:
+        valid, errors = load_batch(amenity_batch_schema)
+    except BatchError as e:
+        return jsonify({"msg": e.msg}), 400
+    total = len(valid) + len(errors)
+    # Names are unique: check the whole batch against the table in one query,
+    # and against earlier items of the same batch.
+    names = [item['name'] for _, item in valid]
+    taken = {name for (name,) in db.session.query(Amenity.name).filter(Amenity.name.in_(names))} if names else set()
+    rows, created = [], {}
+    for index, item in valid:
+        if item['name'] in taken:
+            errors[index] = {"name": ["Amenity already exists"]}
+            continue
+        taken.add(item['name'])
+        row = {"id": new_id(), "name": item['name'], "description": item.get('description')}
+        rows.append(row)
+        created[index] = row['id']
+    if rows:
+        db.session.execute(db.insert(Amenity), rows)
+        db.session.commit()
+        response_cache.invalidate('amenities')
+    return batch_response(total, created, errors)
+
 @amenities_bp.route('/api/v1/amenities/<string:amenity_id>', methods=['GET'])
+@response_cache.cached('amenity:{amenity_id}')
 def get_amenity(amenity_id):
+    version = db.session.query(Amenity.id, Amenity.updated_at).filter(Amenity.id == amenity_id).first()
+    if version is None:
+        abort(404)
+    etag, last_modified = validators(*version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     amenity = Amenity.query.get_or_404(amenity_id)
-    return jsonify({"id": amenity.id, "name": amenity.name, "description": amenity.description}), 200
+    response = jsonify({"id": amenity.id, "name": amenity.name, "description": amenity.description})
+    return with_validators(response, etag, last_modified), 200
 
 @amenities_bp.route('/api/v1/amenities/<string:amenity_id>', methods=['PUT'])
 @jwt_required()
 def update_amenity(amenity_id):
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Admin only"}), 403
     amenity = Amenity.query.get_or_404(amenity_id)
     data = request.get_json()
     amenity.name = data.get('name', amenity.name)
     amenity.description = data.get('description', amenity.description)
     db.session.commit()
+    response_cache.invalidate('amenities', 'amenity:%s' % amenity_id)
     return jsonify({"msg": "Amenity updated"}), 200
 
 @amenities_bp.route('/api/v1/amenities/<string:amenity_id>', methods=['DELETE'])
 @jwt_required()
 def delete_amenity(amenity_id):
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Admin only"}), 403
     amenity = Amenity.query.get_or_404(amenity_id)
     db.session.delete(amenity)
     db.session.commit()
+    response_cache.invalidate('amenities', 'amenity:%s' % amenity_id)
     return jsonify({"msg": "Amenity deleted"}), 200
 
 @amenities_bp.route('/api/v1/amenities/', methods=['GET'])
+@response_cache.cached('amenities')
 def list_amenities():
+    if wants_stream():
+        return stream_query(Amenity.query.order_by(Amenity.id), lambda a: {
+            "id": a.id,
+            "name": a.name,
+            "description": a.description
+        }), 200
+    etag, last_modified = validators(
+        *db.session.query(db.func.count(Amenity.id), db.func.max(Amenity.updated_at)).one()
+    )
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     amenities = Amenity.query.all()
-    return jsonify([{
+    response = jsonify([{
         "id": a.id,
         "name": a.name,
         "description": a.description
-    } for a in amenities]), 200
+    } for a in amenities])
+    return with_validators(response, etag, last_modified), 200
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
-from app.models.user import User
+from app.models.user import User, normalize_email
 from flask_jwt_extended import create_access_token
+from app.identity import identity_claims
 from app.extensions import db
-from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
 auth_bp = Blueprint('auth', __name__)
@@ -14,7 +14,7 @@ def register():
     if not data:
         return jsonify({"msg": "Missing JSON body"}), 400
 
-    email = (data.get('email') or '').strip().lower()
+    email = normalize_email(data.get('email'))
     password = data.get('password')
     first_name = (data.get('first_name') or '').strip()
     last_name = (data.get('last_name') or '').strip()
@@ -24,7 +24,7 @@ def register():
         return jsonify({"msg": "Missing required fields"}), 400
 
     # Check for existing user (case-insensitive)
-    if User.query.filter(func.lower(User.email) == email).first():
+    if User.find_by_email(email):
         return jsonify({"msg": "Email already registered"}), 400
 
     # Create user
@@ -55,15 +55,15 @@ def login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({"msg": "Email and password required"}), 400
 
-    user = User.query.filter(func.lower(User.email) == data['email'].lower().strip()).first()
+    user = User.find_by_email(data['email'])
     if not user or not user.check_password(data['password']):
         return jsonify({"msg": "Invalid credentials"}), 401
+    # Upgrade hashes made with an older work factor while we have the password
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
 
-    claims = {
-        "email": user.email,
-        "is_admin": user.is_admin
-    }
-    access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+    access_token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
     response = jsonify(access_token=access_token)
     response.headers.add("Access-Control-Allow-Origin", "*")
     return response, 200
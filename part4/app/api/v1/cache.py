@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify
+from app.extensions import response_cache
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
+
+cache_bp = Blueprint('cache', __name__)
+
+@cache_bp.route('/api/v1/cache/stats', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    identity = current_identity()
+    if not identity.is_admin:
+        return jsonify({"msg": "Admin only"}), 403
+    return jsonify(response_cache.get_stats()), 200
+
+@cache_bp.route('/api/v1/cache/', methods=['DELETE'])
+@jwt_required()
+def clear_cache():
+    identity = current_identity()
+    if not identity.is_admin:
+        return jsonify({"msg": "Admin only"}), 403
+    response_cache.clear()
+    return jsonify({"msg": "Cache cleared"}), 200
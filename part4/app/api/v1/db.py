@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from app.extensions import db
+from app.db_pool import pool_status
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
+
+db_bp = Blueprint('db', __name__)
+
+@db_bp.route('/api/v1/db/pool', methods=['GET'])
+@jwt_required()
+def db_pool_stats():
+    identity = current_identity()
+    if not identity.is_admin:
+        return jsonify({"msg": "Admin only"}), 403
+    return jsonify(pool_status(db.engine)), 200
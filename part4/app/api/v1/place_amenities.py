@@ -1,42 +1,120 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from app.extensions import db
+from app.extensions import db, response_cache
 from app.models.place import Place
 from app.models.amenity import Amenity
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.models.place_amenity import place_amenity
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from app.identity import current_identity
 
 place_amenities_bp = Blueprint('place_amenities', __name__)
 
+def _attached_ids(place_id):
+    return {
+        amenity_id for (amenity_id,) in db.session.execute(
+            db.select(place_amenity.c.amenity_id).where(place_amenity.c.place_id == place_id))
+    }
+
+def _apply_amenity_diff(place, diff):
+    """Write a change to a place's amenities straight to the association
+    table: one bulk INSERT, one bulk DELETE, and a bump of the place's
+    updated_at so conditional GETs of the place see the change.
+
+    ``diff(current)`` maps the attached amenity ids to ``(to_add,
+    to_remove)``. If a concurrent write makes the INSERT fail (the pair was
+    attached meanwhile, or the amenity deleted), the diff is recomputed and
+    applied once more. Returns ``(to_add, to_remove)``, or None if the retry
+    failed too.
+    """
+    place_id = place.id
+    for _ in range(2):
+        to_add, to_remove = diff(_attached_ids(place_id))
+        if not (to_add or to_remove):
+            return to_add, to_remove
+        try:
+            if to_add:
+                db.session.execute(
+                    place_amenity.insert(),
+                    [{"place_id": place_id, "amenity_id": amenity_id} for amenity_id in to_add]
+                )
+            if to_remove:
+                db.session.execute(
+                    place_amenity.delete().where(
+                        place_amenity.c.place_id == place_id,
+                        place_amenity.c.amenity_id.in_(to_remove))
+                )
+            place.updated_at = datetime.utcnow()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            continue
+        response_cache.invalidate('place:%s' % place_id)
+        return to_add, to_remove
+    return None
+
+def _conflict():
+    return jsonify({"msg": "Amenities of this place changed concurrently, retry"}), 409
+
 @place_amenities_bp.route('/api/v1/places/<string:place_id>/amenities', methods=['GET'])
+@response_cache.cached('place:{place_id}')
 def get_place_amenities(place_id):
     place = Place.query.get_or_404(place_id)
-    return jsonify([{"id": a.id, "name": a.name, "description": a.description} for a in place.amenities]), 200
+    amenities = place.amenities.all()
+    response_cache.add_tags(*('amenity:%s' % a.id for a in amenities))
+    return jsonify([{"id": a.id, "name": a.name, "description": a.description} for a in amenities]), 200
+
+@place_amenities_bp.route('/api/v1/places/<string:place_id>/amenities', methods=['PUT'])
+@jwt_required()
+def set_place_amenities(place_id):
+    place = Place.query.get_or_404(place_id)
+    identity = current_identity()
+    if str(place.owner_id) != str(identity.id) and not identity.is_admin:
+        return jsonify({"msg": "Forbidden"}), 403
+    data = request.get_json(silent=True)
+    amenity_ids = data.get('amenity_ids') if isinstance(data, dict) else data
+    if not isinstance(amenity_ids, list) or not all(isinstance(a, str) for a in amenity_ids):
+        return jsonify({"msg": "amenity_ids must be a list of amenity ids"}), 400
+    wanted = set(amenity_ids)
+    known = {
+        amenity_id for (amenity_id,) in
+        db.session.query(Amenity.id).filter(Amenity.id.in_(wanted))
+    } if wanted else set()
+    unknown = wanted - known
+    if unknown:
+        return jsonify({"msg": "Unknown amenity ids", "amenity_ids": sorted(unknown)}), 400
+    applied = _apply_amenity_diff(place, lambda current: (wanted - current, current - wanted))
+    if applied is None:
+        return _conflict()
+    to_add, to_remove = applied
+    return jsonify({
+        "amenity_ids": sorted(wanted),
+        "added": sorted(to_add),
+        "removed": sorted(to_remove),
+    }), 200
 
 @place_amenities_bp.route('/api/v1/places/<string:place_id>/amenities', methods=['POST'])
 @jwt_required()
 def add_amenity_to_place(place_id):
     place = Place.query.get_or_404(place_id)
-    claims = get_jwt()
-    current_user_id = get_jwt_identity()
-    if str(place.owner_id) != str(current_user_id) and not claims.get('is_admin'):
+    identity = current_identity()
+    if str(place.owner_id) != str(identity.id) and not identity.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
     data = request.get_json()
     amenity_id = data.get('amenity_id')
-    amenity = Amenity.query.get_or_404(amenity_id)
-    if amenity not in place.amenities:
-        place.amenities.append(amenity)
-        db.session.commit()
+    Amenity.query.get_or_404(amenity_id)
+    if _apply_amenity_diff(place, lambda current: ({amenity_id} - current, set())) is None:
+        return _conflict()
     return jsonify({"msg": "Amenity added to place"}), 200
 
 @place_amenities_bp.route('/api/v1/places/<string:place_id>/amenities/<string:amenity_id>', methods=['DELETE'])
 @jwt_required()
 def remove_amenity_from_place(place_id, amenity_id):
     place = Place.query.get_or_404(place_id)
-    claims = get_jwt()
-    current_user_id = get_jwt_identity()
-    if str(place.owner_id) != str(current_user_id) and not claims.get('is_admin'):
+    identity = current_identity()
+    if str(place.owner_id) != str(identity.id) and not identity.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
-    amenity = Amenity.query.get_or_404(amenity_id)
-    if amenity in place.amenities:
-        place.amenities.remove(amenity)
-        db.session.commit()
+    Amenity.query.get_or_404(amenity_id)
+    if _apply_amenity_diff(place, lambda current: (set(), {amenity_id} & current)) is None:
+        return _conflict()
     return jsonify({"msg": "Amenity removed from place"}), 200
@@ -1,15 +1,31 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, abort
+from app.extensions import db, response_cache
 from app.models.place import Place
+from app.models.review import Review, FEED_FIELDS, REVIEW_FIELDS
+from app.conditional import validators, not_modified, with_validators
+from app.fieldsets import parse_fields
 
 place_reviews_bp = Blueprint('place_reviews', __name__)
 
 @place_reviews_bp.route('/api/v1/places/<string:place_id>/reviews', methods=['GET'])
+@response_cache.cached('place:{place_id}')
 def get_place_reviews(place_id):
-    place = Place.query.get_or_404(place_id)
-    reviews = place.reviews
-    return jsonify([{
-        "id": r.id,
-        "text": r.text,
-        "rating": r.rating,
-        "user_id": r.user_id  # Assuming Review has user_id not author_id
-    } for r in reviews]), 200
+    try:
+        fields = parse_fields(REVIEW_FIELDS, FEED_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    version = (
+        db.session.query(Place.id, *Review.feed_version_columns(Place.id))
+        .filter(Place.id == place_id)
+        .first()
+    )
+    if version is None:
+        abort(404)
+    etag, last_modified = validators(*version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    authors = set()
+    review_list = Review.list_with_authors(place_id, fields, authors)
+    response_cache.add_tags(*('user:%s' % user_id for user_id in authors))
+    return with_validators(jsonify(review_list), etag, last_modified), 200
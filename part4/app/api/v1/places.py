@@ -1,50 +1,137 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import db
+import math
+from flask import Blueprint, request, jsonify, abort
+from app.extensions import db, response_cache
 from app.models.place import Place
-from app.models.review import Review
-from app.models.user import User
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.place_location_trigram import location_candidates, normalize_location
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
 from app.schemas import PlaceSchema
+from app.batch import BatchError, load_batch, batch_response
+from app.pagination import parse_limit, encode_cursor, decode_cursor, ID_KEY, RATING_KEY
+from app.conditional import validators, not_modified, with_validators
+from app.geo import haversine_km, radius_bbox, split_bbox, cell_ranges
+from app.streaming import wants_stream, stream_query
+from app.fieldsets import (PLACE_FIELDS, SUMMARY_FIELDS, INCLUDES, parse_fields, parse_include,
+                           place_columns, place_dict, with_owner, attach_includes)
+from app.models.review import FEED_FIELDS, REVIEW_FIELDS
 
 places_bp = Blueprint('places', __name__)
 place_schema = PlaceSchema()
+place_batch_schema = PlaceSchema(many=True)
 
 @places_bp.route('/api/v1/places/', methods=['GET'])
+@response_cache.cached('places')
 def get_places():
-    places = Place.query.all()
-    return jsonify([p.to_dict() for p in places]), 200
+    sort = request.args.get('sort', 'id')
+    if sort not in ('id', 'rating'):
+        return jsonify({"msg": "sort must be 'id' or 'rating'"}), 400
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor, (ID_KEY,) if sort == 'id' else (RATING_KEY, ID_KEY)) if cursor else None
+        fields = parse_fields(PLACE_FIELDS, SUMMARY_FIELDS)
+        include = parse_include(())
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if wants_stream():
+        if include:
+            return jsonify({"msg": "include cannot be combined with stream"}), 400
+        # Export of the whole list in one response, in the requested order
+        order = (Place.avg_rating.desc(), Place.id.desc()) if sort == 'rating' else (Place.id,)
+        return stream_query(db.session.query(*place_columns(fields)).order_by(*order),
+                            lambda row: place_dict(row, fields),
+                            key='places', extra={'next': None}), 200
+
+    # Keyset pagination: each page is an index range scan starting after the
+    # last row of the previous page, so its cost does not depend on how deep
+    # into the list it is. Rating order walks ix_places_avg_rating_id.
+    query = db.session.query(Place.id, Place.updated_at, Place.avg_rating,
+                             *Place.relation_version_columns(include))
+    if sort == 'rating':
+        query = query.order_by(Place.avg_rating.desc(), Place.id.desc())
+        if after is not None:
+            query = query.filter(db.or_(
+                Place.avg_rating < after[0],
+                db.and_(Place.avg_rating == after[0], Place.id < after[1])
+            ))
+    else:
+        query = query.order_by(Place.id)
+        if after is not None:
+            query = query.filter(Place.id > after[0])
+    keys = query.limit(limit + 1).all()
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = keys[-1]
+        next_cursor = encode_cursor([last.id] if sort == 'id' else [last.avg_rating, last.id])
+
+    # The page's ids and row versions (and those of included relations) are
+    # enough to answer a conditional GET; rows are only loaded when the body
+    # has to be built, and then only the requested columns.
+    etag, last_modified = validators(next_cursor, *[v for k in keys for v in (k.id, k.updated_at, *k[3:])])
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    query = db.session.query(*place_columns(fields, extra=('owner_id',) if 'owner' in include else ()))
+    if 'owner' in include:
+        query = with_owner(query)
+    by_id = {row.id: row for row in query.filter(Place.id.in_([k.id for k in keys]))}
+    rows = [by_id[k.id] for k in keys if k.id in by_id]
+    items = [place_dict(row, fields) for row in rows]
+    response_cache.add_tags(*('place:%s' % k.id for k in keys), *attach_includes(items, rows, include))
+    if sort == 'rating':
+        response_cache.add_tags('places:rating')
+    response = jsonify({
+        "places": items,
+        "next": next_cursor
+    })
+    return with_validators(response, etag, last_modified), 200
 
 @places_bp.route('/api/v1/places/<string:place_id>', methods=['GET'])
+@response_cache.cached('place:{place_id}')
 def get_place(place_id):
-    place = Place.query.get_or_404(place_id)
-    # Build reviews list with user_name
-    reviews = Review.query.filter_by(place_id=place.id).all()
-    review_list = []
-    for r in reviews:
-        user = User.query.get(r.user_id)
-        if user:
-            first = user.first_name if user.first_name else ""
-            last = user.last_name if user.last_name else ""
-            user_name = (first + " " + last).strip() if (first or last) else user.email
-        else:
-            user_name = "Anonymous"
-        review_list.append({
-            "id": r.id,
-            "text": r.text,
-            "rating": r.rating,
-            "user_id": r.user_id,
-            "user_name": user_name
-        })
-
-    # Get place data and embed reviews
-    place_data = place.to_dict()
-    place_data['reviews'] = review_list
-    return jsonify(place_data), 200
+    try:
+        fields = parse_fields(PLACE_FIELDS, tuple(PLACE_FIELDS))
+        include = parse_include()
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    # Without ?fields= or ?include= the detail keeps its original shape:
+    # every relation, with the owner reduced to a "host" display name. A
+    # sparse fieldset embeds relations only when ?include= asks for them.
+    legacy = include is None and 'fields' not in request.args
+    if legacy:
+        include = INCLUDES
+    elif include is None:
+        include = ()
+    version = Place.detail_version(place_id, include)
+    if version is None:
+        abort(404)
+    etag, last_modified = validators(*version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+
+    # Place (and owner) in one query, then one query per included relation,
+    # regardless of how many amenities or reviews there are.
+    query = db.session.query(*place_columns(fields, extra=('owner_id',) if 'owner' in include else ()))
+    if 'owner' in include:
+        query = with_owner(query)
+    row = query.filter(Place.id == place_id).first()
+    if row is None:
+        abort(404)
+    place_data = place_dict(row, fields)
+    response_cache.add_tags(*attach_includes([place_data], [row], include))
+    if legacy:
+        owner = place_data.pop('owner')
+        place_data['host'] = owner['name'] if owner else None
+    return with_validators(jsonify(place_data), etag, last_modified), 200
 
 @places_bp.route('/api/v1/places/', methods=['POST'])
 @jwt_required()
 def create_place():
-    current_user = get_jwt_identity()
+    identity = current_identity()
     data = request.get_json()
     if not data:
         return jsonify({"msg": "Missing JSON body"}), 400
@@ -59,18 +146,36 @@ def create_place():
         latitude=validated.get('latitude'),
         longitude=validated.get('longitude'),
         location=validated.get('location'),
-        owner_id=current_user
+        owner_id=identity.id
     )
     db.session.add(place)
     db.session.commit()
+    response_cache.invalidate('places')
     return jsonify(place.to_dict()), 201
 
+@places_bp.route('/api/v1/places/batch', methods=['POST'])
+@jwt_required()
+def create_places_batch():
+    identity = current_identity()
+    try:
+        valid, errors = load_batch(place_batch_schema)
+    except BatchError as e:
+        return jsonify({"msg": e.msg}), 400
+    created = {}
+    if valid:
+        rows = [dict(item, owner_id=identity.id) for _, item in valid]
+        ids = Place.bulk_insert(rows)
+        db.session.commit()
+        created = {index: place_id for (index, _), place_id in zip(valid, ids)}
+        response_cache.invalidate('places')
+    return batch_response(len(valid) + len(errors), created, errors)
+
 @places_bp.route('/api/v1/places/<string:place_id>', methods=['PUT'])
 @jwt_required()
 def update_place(place_id):
-    current_user = get_jwt_identity()
+    identity = current_identity()
     place = Place.query.get_or_404(place_id)
-    if place.owner_id != current_user:
+    if place.owner_id != identity.id:
         return jsonify({"msg": "Unauthorized action"}), 403
     data = request.get_json()
     if not data:
@@ -82,30 +187,149 @@ def update_place(place_id):
     for key, value in validated.items():
         setattr(place, key, value)
     db.session.commit()
+    response_cache.invalidate('places', 'place:%s' % place_id)
     return jsonify({"msg": "Place updated"}), 200
 
 @places_bp.route('/api/v1/places/<string:place_id>', methods=['DELETE'])
 @jwt_required()
 def delete_place(place_id):
-    current_user = get_jwt_identity()
+    identity = current_identity()
     place = Place.query.get_or_404(place_id)
-    if place.owner_id != current_user:
+    if place.owner_id != identity.id:
         return jsonify({"msg": "Unauthorized action"}), 403
     db.session.delete(place)
     db.session.commit()
+    response_cache.invalidate('places', 'place:%s' % place_id)
     return jsonify({"msg": "Place deleted"}), 200
 
+def _finite_arg(name):
+    """Float query argument, None when absent. float() also parses 'nan'
+    and 'inf', which no coordinate, distance or price can be."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not math.isfinite(number):
+        raise ValueError("%s must be a finite number" % name)
+    return number
+
+def _valid_lat_lon(lat, lon):
+    # Comparisons with nan are false, so this rejects it too
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+def _within_boxes(boxes):
+    return db.or_(*[
+        db.and_(Place.latitude.between(min_lat, max_lat), Place.longitude.between(min_lon, max_lon))
+        for min_lat, min_lon, max_lat, max_lon in boxes
+    ])
+
 @places_bp.route('/api/v1/places/search', methods=['GET'])
+@response_cache.cached('places')
 def search_places():
-    location = request.args.get('location')
-    min_price = request.args.get('min_price', type=float)
-    max_price = request.args.get('max_price', type=float)
-    query = Place.query
+    location = (request.args.get('location') or '').strip()
+    bbox = request.args.get('bbox')
+    sort = request.args.get('sort')
+    try:
+        lat, lon, radius_km, min_price, max_price = (
+            _finite_arg(name) for name in ('lat', 'lon', 'radius_km', 'min_price', 'max_price'))
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    if (lat is None) != (lon is None):
+        return jsonify({"msg": "lat and lon must be given together"}), 400
+    if lat is not None and not _valid_lat_lon(lat, lon):
+        return jsonify({"msg": "lat/lon out of range"}), 400
+    if radius_km is not None and (lat is None or radius_km <= 0):
+        return jsonify({"msg": "radius_km requires lat and lon and must be positive"}), 400
+    if sort == 'distance' and lat is None:
+        return jsonify({"msg": "sort=distance requires lat and lon"}), 400
+    stream = wants_stream()
+    if stream and sort == 'distance':
+        return jsonify({"msg": "stream cannot be combined with sort=distance"}), 400
+    try:
+        fields = parse_fields(PLACE_FIELDS, SUMMARY_FIELDS if stream else tuple(PLACE_FIELDS))
+        include = parse_include()
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if stream and include:
+        return jsonify({"msg": "include cannot be combined with stream"}), 400
+    review_fields = FEED_FIELDS
+    if include is None:
+        # Original shape: reviews embedded in their plain form, no authors
+        include = () if stream else ('reviews',)
+        review_fields = tuple(f for f in REVIEW_FIELDS if f != 'user_name')
+    boxes = []
+    if bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(','))
+        except ValueError:
+            return jsonify({"msg": "bbox must be min_lon,min_lat,max_lon,max_lat"}), 400
+        if not (_valid_lat_lon(min_lat, min_lon) and _valid_lat_lon(max_lat, max_lon)):
+            return jsonify({"msg": "bbox out of range"}), 400
+        boxes = split_bbox(min_lat, min_lon, max_lat, max_lon)
+
+    extra = ('latitude', 'longitude') if lat is not None else ()
+    if 'owner' in include:
+        extra += ('owner_id',)
+    query = db.session.query(*place_columns(fields, extra=extra))
+    if 'owner' in include:
+        query = with_owner(query)
     if location:
-        query = query.filter(Place.location.ilike(f'%{location}%'))
+        # Candidates come from the trigram index; the substring test then
+        # only runs on those rows instead of scanning every place.
+        query = query.filter(Place.id.in_(location_candidates(location)))
+        if len(location) >= 3:
+            query = query.filter(
+                Place.location_normalized.contains(normalize_location(location), autoescape=True))
     if min_price is not None:
         query = query.filter(Place.price >= min_price)
     if max_price is not None:
         query = query.filter(Place.price <= max_price)
-    places = query.all()
-    return jsonify([p.to_dict() for p in places]), 200
+    radius_boxes = radius_bbox(lat, lon, radius_km) if radius_km is not None else []
+    if radius_boxes or boxes:
+        # Prune by grid cell (index range scans on geo_cell), then by the
+        # exact bounding boxes; the radius itself is checked below.
+        query = query.filter(db.or_(*[
+            Place.geo_cell.between(first, last)
+            for first, last in cell_ranges(radius_boxes or boxes)
+        ]))
+        for box_set in (boxes, radius_boxes):
+            if box_set:
+                query = query.filter(_within_boxes(box_set))
+    def distance_to(row):
+        if row.latitude is None or row.longitude is None:
+            return None
+        return haversine_km(lat, lon, row.latitude, row.longitude)
+
+    if stream:
+        # Included relations would need more queries on a connection that
+        # is still streaming a server-side cursor
+        def serialize(row):
+            if lat is None:
+                return place_dict(row, fields)
+            distance = distance_to(row)
+            if radius_km is not None and (distance is None or distance > radius_km):
+                return None
+            return dict(place_dict(row, fields), distance_km=round(distance, 3) if distance is not None else None)
+        return stream_query(query.order_by(Place.id), serialize), 200
+    rows = query.all()
+
+    results = []
+    for row in rows:
+        distance = distance_to(row) if lat is not None else None
+        if radius_km is not None and (distance is None or distance > radius_km):
+            continue
+        results.append((distance, row))
+    if sort == 'distance':
+        results.sort(key=lambda r: (r[0] is None, r[0]))
+    rows = [row for _, row in results]
+    items = [place_dict(row, fields) for row in rows]
+    response_cache.add_tags(*('place:%s' % row.id for row in rows),
+                            *attach_includes(items, rows, include, review_fields))
+    if lat is not None:
+        for item, (distance, _) in zip(items, results):
+            item['distance_km'] = round(distance, 3) if distance is not None else None
+    return jsonify(items), 200
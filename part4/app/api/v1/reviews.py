@@ -1,132 +1,188 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import db
-from app.models.review import Review
+import logging
+from datetime import datetime
+from flask import Blueprint, request, jsonify, abort
+from app.extensions import db, response_cache
+from app.ids import new_id
+from app.models.review import Review, FEED_FIELDS, REVIEW_FIELDS
 from app.models.place import Place
-from app.models.user import User
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
+from marshmallow import EXCLUDE
+from app.schemas import ReviewSchema, ReviewBatchItemSchema
+from app.batch import BatchError, load_batch, batch_response
+from app.conditional import validators, not_modified, with_validators
+from app.fieldsets import parse_fields
 
 reviews_bp = Blueprint('reviews', __name__)
+logger = logging.getLogger(__name__)
+review_schema = ReviewSchema(unknown=EXCLUDE)
+review_batch_schema = ReviewBatchItemSchema(many=True, unknown=EXCLUDE)
 
 @reviews_bp.route('/api/v1/reviews/', methods=['POST'])
 @jwt_required()
 def create_review():
-    current_user_id = get_jwt_identity()
+    identity = current_identity()
     data = request.get_json()
     if not data or 'place_id' not in data or 'text' not in data or 'rating' not in data:
         return jsonify({"msg": "Missing required fields"}), 400
     place = Place.query.get_or_404(data['place_id'])
-    user = User.query.get_or_404(current_user_id)
     # Prevent reviewing your own place
-    if place.owner_id == current_user_id:
+    if place.owner_id == identity.id:
         return jsonify({"msg": "Cannot review your own place"}), 403
     # Prevent duplicate review
-    existing_review = Review.query.filter_by(user_id=current_user_id, place_id=place.id).first()
+    existing_review = Review.query.filter_by(user_id=identity.id, place_id=place.id).first()
     if existing_review:
         return jsonify({"msg": "Already reviewed this place"}), 400
+    try:
+        validated = review_schema.load(data)
+    except Exception as e:
+        return jsonify({"msg": str(e)}), 400
     review = Review(
-        text=data['text'],
-        rating=data['rating'],
-        user_id=current_user_id,
+        text=validated['text'],
+        rating=validated['rating'],
+        user_id=identity.id,
         place_id=place.id
     )
     db.session.add(review)
+    Place.apply_rating_change(place.id, added=review.rating)
     db.session.commit()
-    first = user.first_name if user and user.first_name else ""
-    last = user.last_name if user and user.last_name else ""
-    user_name = (first + " " + last).strip() if (first or last) else user.email if user else "Anonymous"
-    return jsonify({
-        "id": review.id,
-        "text": review.text,
-        "rating": review.rating,
-        "user_id": review.user_id,
-        "user_name": user_name
-    }), 201
+    response_cache.invalidate('place:%s' % review.place_id, 'places:rating')
+    return jsonify(review.to_dict_with_author(identity.name)), 201
+
+@reviews_bp.route('/api/v1/reviews/batch', methods=['POST'])
+@jwt_required()
+def create_reviews_batch():
+    identity = current_identity()
+    try:
+        valid, errors = load_batch(review_batch_schema)
+    except BatchError as e:
+        return jsonify({"msg": e.msg}), 400
+    total = len(valid) + len(errors)
+    # Same rules as create_review, checked for the whole batch with one query
+    # for the places and one for the caller's existing reviews of them.
+    place_ids = {item['place_id'] for _, item in valid}
+    owners = dict(db.session.query(Place.id, Place.owner_id).filter(Place.id.in_(place_ids))) if place_ids else {}
+    reviewed = {
+        pid for (pid,) in db.session.query(Review.place_id)
+        .filter(Review.user_id == identity.id, Review.place_id.in_(place_ids))
+    } if place_ids else set()
+    now = datetime.utcnow()
+    rows, created, ratings = [], {}, {}
+    for index, item in valid:
+        place_id = item['place_id']
+        if place_id not in owners:
+            errors[index] = {"place_id": ["Place not found"]}
+        elif owners[place_id] == identity.id:
+            errors[index] = {"place_id": ["Cannot review your own place"]}
+        elif place_id in reviewed:
+            errors[index] = {"place_id": ["Already reviewed this place"]}
+        else:
+            reviewed.add(place_id)
+            row = {
+                "id": new_id(), "text": item['text'], "rating": item['rating'],
+                "user_id": identity.id, "place_id": place_id,
+                "created_at": now, "updated_at": now,
+            }
+            rows.append(row)
+            created[index] = row['id']
+            ratings.setdefault(place_id, []).append(item['rating'])
+    if rows:
+        db.session.execute(db.insert(Review), rows)
+        for place_id, added in ratings.items():
+            Place.apply_rating_changes(place_id, added=added)
+        db.session.commit()
+        response_cache.invalidate('places:rating', *('place:%s' % place_id for place_id in ratings))
+    return batch_response(total, created, errors)
 
 @reviews_bp.route('/api/v1/reviews/<string:review_id>', methods=['PUT'])
 @jwt_required()
 def update_review(review_id):
-    current_user_id = get_jwt_identity()
+    identity = current_identity()
     review = Review.query.get_or_404(review_id)
-    user = User.query.get_or_404(current_user_id)
-    is_admin = getattr(user, "is_admin", False)
-    if review.user_id != current_user_id and not is_admin:
+    if review.user_id != identity.id and not identity.is_admin:
         return jsonify({"msg": "Unauthorized action"}), 403
     data = request.get_json()
     if not data:
         return jsonify({"msg": "Missing JSON body"}), 400
-    review.text = data.get('text', review.text)
-    review.rating = data.get('rating', review.rating)
+    try:
+        validated = review_schema.load(data, partial=True)
+    except Exception as e:
+        return jsonify({"msg": str(e)}), 400
+    old_rating = review.rating
+    review.text = validated.get('text', review.text)
+    review.rating = validated.get('rating', review.rating)
+    if review.rating != old_rating:
+        Place.apply_rating_change(review.place_id, added=review.rating, removed=old_rating)
     db.session.commit()
+    response_cache.invalidate('place:%s' % review.place_id, 'places:rating')
     return jsonify({"msg": "Review updated"}), 200
 
 @reviews_bp.route('/api/v1/reviews/<string:review_id>', methods=['DELETE'])
 @jwt_required()
 def delete_review(review_id):
-    current_user_id = get_jwt_identity()
+    identity = current_identity()
     review = Review.query.get_or_404(review_id)
-    user = User.query.get_or_404(current_user_id)
-    is_admin = getattr(user, "is_admin", False)
-    if review.user_id != current_user_id and not is_admin:
+    if review.user_id != identity.id and not identity.is_admin:
         return jsonify({"msg": "Unauthorized action"}), 403
     db.session.delete(review)
+    Place.apply_rating_change(review.place_id, removed=review.rating)
     db.session.commit()
+    response_cache.invalidate('place:%s' % review.place_id, 'places:rating')
     return jsonify({"msg": "Review deleted"}), 200
 
 @reviews_bp.route('/api/v1/places/<string:place_id>/reviews/', methods=['POST'])
 @jwt_required()
 def create_place_review(place_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(current_user_id)
+    identity = current_identity()
     place = Place.query.get_or_404(place_id)
     data = request.get_json()
     if not data or 'text' not in data or 'rating' not in data:
         return jsonify({"msg": "Missing required fields"}), 400
     # Prevent reviewing your own place
-    if place.owner_id == current_user_id:
+    if place.owner_id == identity.id:
         return jsonify({"msg": "Cannot review your own place"}), 403
     # Prevent duplicate review
-    existing_review = Review.query.filter_by(user_id=current_user_id, place_id=place.id).first()
+    existing_review = Review.query.filter_by(user_id=identity.id, place_id=place.id).first()
     if existing_review:
         return jsonify({"msg": "Already reviewed this place"}), 400
+    try:
+        validated = review_schema.load(data)
+    except Exception as e:
+        return jsonify({"msg": str(e)}), 400
     review = Review(
-        text=data['text'],
-        rating=data['rating'],
-        user_id=current_user_id,
+        text=validated['text'],
+        rating=validated['rating'],
+        user_id=identity.id,
         place_id=place.id
     )
     db.session.add(review)
+    Place.apply_rating_change(place.id, added=review.rating)
     db.session.commit()
-    first = user.first_name if user and user.first_name else ""
-    last = user.last_name if user and user.last_name else ""
-    user_name = (first + " " + last).strip() if (first or last) else user.email if user else "Anonymous"
-    return jsonify({
-        "id": review.id,
-        "text": review.text,
-        "rating": review.rating,
-        "user_id": review.user_id,
-        "user_name": user_name
-    }), 201
+    response_cache.invalidate('place:%s' % review.place_id, 'places:rating')
+    return jsonify(review.to_dict_with_author(identity.name)), 201
 
 @reviews_bp.route('/api/v1/places/<string:place_id>/reviews/', methods=['GET'])
+@response_cache.cached('place:{place_id}')
 def list_place_reviews(place_id):
-    place = Place.query.get_or_404(place_id)
-    reviews = Review.query.filter_by(place_id=place.id).all()
-    review_list = []
-    for r in reviews:
-        user = User.query.get(r.user_id)
-        # Debugging
-        print(f"Review user_id: {r.user_id} --> user: {user.first_name if user else 'None'} {user.last_name if user else ''}")
-        if user:
-            first = user.first_name if user.first_name else ""
-            last = user.last_name if user.last_name else ""
-            user_name = (first + " " + last).strip() if (first or last) else user.email
-        else:
-            user_name = "Anonymous"
-        review_list.append({
-            "id": r.id,
-            "text": r.text,
-            "rating": r.rating,
-            "user_id": r.user_id,
-            "user_name": user_name
-        })
-    return jsonify(review_list), 200
+    try:
+        fields = parse_fields(REVIEW_FIELDS, FEED_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    version = (
+        db.session.query(Place.id, *Review.feed_version_columns(Place.id))
+        .filter(Place.id == place_id)
+        .first()
+    )
+    if version is None:
+        abort(404)
+    etag, last_modified = validators(*version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    authors = set()
+    review_list = Review.list_with_authors(place_id, fields, authors)
+    response_cache.add_tags(*('user:%s' % user_id for user_id in authors))
+    if logger.isEnabledFor(logging.DEBUG):
+        for r in review_list:
+            logger.debug("Review user_id: %s --> user: %s", r.get("user_id"), r.get("user_name"))
+    return with_validators(jsonify(review_list), etag, last_modified), 200
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import db, bcrypt
-from app.models.user import User
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from sqlalchemy import func
+from app.extensions import db, bcrypt, response_cache
+from app.models.user import User, normalize_email
+from flask_jwt_extended import jwt_required
+from app.identity import current_identity
+from app.streaming import wants_stream, stream_query
 from sqlalchemy.exc import IntegrityError
 
 users_bp = Blueprint('users', __name__)
@@ -13,7 +14,7 @@ def register():
     if not data:
         return jsonify({"msg": "Missing JSON body"}), 400
 
-    email = (data.get('email') or '').strip().lower()
+    email = normalize_email(data.get('email'))
     password = data.get('password')
     first_name = data.get('first_name')
     last_name = data.get('last_name')
@@ -21,7 +22,7 @@ def register():
     if not email or not password or not first_name or not last_name:
         return jsonify({"msg": "Email, password, first_name, and last_name are required"}), 400
 
-    existing_user = User.query.filter(func.lower(User.email) == email).first()
+    existing_user = User.find_by_email(email)
     if existing_user:
         return jsonify({"msg": "Email already registered"}), 400
 
@@ -43,17 +44,19 @@ def register():
 @users_bp.route('/api/v1/users/', methods=['GET'])
 @jwt_required()
 def list_users():
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
+    if wants_stream():
+        return stream_query(User.query.order_by(User.id), User.to_dict), 200
     users = User.query.all()
     return jsonify([u.to_dict() for u in users]), 200
 
 @users_bp.route('/api/v1/users/<string:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict()), 200
@@ -61,19 +64,19 @@ def get_user(user_id):
 @users_bp.route('/api/v1/users/<string:user_id>', methods=['PUT'])
 @jwt_required()
 def update_user(user_id):
-    user_id_from_token = get_jwt_identity()
-    claims = get_jwt()
+    identity = current_identity()
     user = User.query.get_or_404(user_id)
     # Only admin or the user themself can update
-    if not claims.get('is_admin') and str(user.id) != str(user_id_from_token):
+    if not identity.is_admin and str(user.id) != str(identity.id):
         return jsonify({"msg": "Forbidden"}), 403
     data = request.get_json()
     user.first_name = data.get('first_name', user.first_name)
     user.last_name = data.get('last_name', user.last_name)
-    if claims.get('is_admin'):
+    if identity.is_admin:
         email = data.get('email')
         if email:
-            if User.query.filter(func.lower(User.email) == email.lower(), User.id != user.id).first():
+            existing_user = User.find_by_email(email)
+            if existing_user and existing_user.id != user.id:
                 return jsonify({"msg": "Email already taken"}), 400
             user.email = email
         password = data.get('password')
@@ -83,15 +86,17 @@ def update_user(user_id):
         if is_admin is not None:
             user.is_admin = bool(is_admin)
     db.session.commit()
+    response_cache.invalidate('user:%s' % user_id)
     return jsonify({"msg": "User updated"}), 200
 
 @users_bp.route('/api/v1/users/<string:user_id>', methods=['DELETE'])
 @jwt_required()
 def delete_user(user_id):
-    claims = get_jwt()
-    if not claims.get('is_admin'):
+    identity = current_identity()
+    if not identity.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    response_cache.invalidate('user:%s' % user_id)
     return jsonify({"msg": "User deleted"}), 200
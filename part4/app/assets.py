@@ -0,0 +1,177 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+
+from flask import Blueprint, abort, current_app, send_from_directory, url_for
+
+from app.compression import COMPRESSIBLE_MIMETYPES, ENCODERS, available_encodings, negotiate
+
+# Precompressed variants are written once, at the strongest levels
+BUILD_LEVELS = {'br': 11, 'gzip': 9}
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+MANIFEST = 'manifest.json'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_PAGE_REFERENCE = re.compile(r'''((?:href|src)=["'])static/([^"']+)''')
+
+assets_bp = Blueprint('assets', __name__)
+
+
+def _write(path, data):
+    # Workers may build at the same time; never expose a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _store(dest, name, data, encodings, overwrite=False):
+    """Write ``data`` as ``name`` plus its precompressed variants (those
+    that come out smaller), skipping files already there unless
+    ``overwrite``. Returns the encodings stored."""
+    path = os.path.join(dest, name)
+    if overwrite or not os.path.exists(path):
+        _write(path, data)
+    if mimetypes.guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES:
+        return []
+    stored = []
+    for encoding in encodings:
+        variant = path + SUFFIXES[encoding]
+        if overwrite or not os.path.exists(variant):
+            compressed = ENCODERS[encoding][0](data, BUILD_LEVELS[encoding])
+            if len(compressed) >= len(data):
+                continue
+            _write(variant, compressed)
+        stored.append(encoding)
+    return stored
+
+
+def build_assets(source, dest, pages=(), encodings=None):
+    """Fingerprint the files in ``source`` into ``dest`` and precompress them.
+
+    ``styles.css`` is copied to ``styles.<hash>.css``, so its URL changes
+    whenever its content does and can be cached forever. ``pages`` (the
+    frontend's HTML files) are copied under their own names with their
+    ``static/...`` references rewritten to the fingerprinted names. Files
+    already built are left alone, which makes rebuilding at every startup
+    cheap. Returns the manifest, also saved as ``dest/manifest.json``.
+    """
+    encodings = available_encodings() if encodings is None else encodings
+    os.makedirs(dest, exist_ok=True)
+    manifest = {'assets': {}, 'pages': {}, 'encodings': {}}
+    for name in sorted(os.listdir(source)):
+        path = os.path.join(source, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        built = '%s.%s%s' % (stem, hashlib.sha1(data).hexdigest()[:12], ext)
+        manifest['assets'][name] = built
+        manifest['encodings'][built] = _store(dest, built, data, encodings)
+
+    def fingerprinted(match):
+        return match.group(1) + 'static/' + manifest['assets'].get(match.group(2), match.group(2))
+
+    for page in pages:
+        name = os.path.basename(page)
+        with open(page, encoding='utf-8') as f:
+            data = _PAGE_REFERENCE.sub(fingerprinted, f.read()).encode('utf-8')
+        manifest['pages'][name] = hashlib.sha1(data).hexdigest()[:12]
+        # Pages keep their names, so a rebuild has to replace them
+        manifest['encodings'][name] = _store(dest, name, data, encodings, overwrite=True)
+
+    _write(os.path.join(dest, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def _serve(name, etag, cache_control):
+    store = current_app.extensions['assets']
+    encodings = store.manifest['encodings'].get(name, [])
+    encoding = negotiate(encodings)
+    stored = name + SUFFIXES[encoding] if encoding else name
+    response = send_from_directory(
+        store.build_dir, stored, mimetype=mimetypes.guess_type(name)[0],
+        etag='%s-%s' % (etag, encoding) if encoding else etag,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+@assets_bp.route('/static/<path:filename>')
+def static_asset(filename):
+    manifest = current_app.extensions['assets'].manifest
+    if filename in manifest['encodings'] and filename not in manifest['pages']:
+        return _serve(filename, filename, 'public, max-age=%d, immutable' % IMMUTABLE_MAX_AGE)
+    if filename in manifest['assets']:
+        # Unversioned name: always revalidate, then serve the current build
+        built = manifest['assets'][filename]
+        return _serve(built, built, 'no-cache')
+    abort(404)
+
+
+@assets_bp.route('/', defaults={'page': 'index.html'})
+@assets_bp.route('/<page>')
+def frontend_page(page):
+    manifest = current_app.extensions['assets'].manifest
+    if page not in manifest['pages']:
+        abort(404)
+    return _serve(page, manifest['pages'][page], 'no-cache')
+
+
+class AssetStore:
+    """Serves the frontend pages and ``static/`` assets from a build of
+    fingerprinted, precompressed files (see ``build_assets``).
+
+    The build runs at startup unless ``ASSETS_BUILD_ON_STARTUP`` is off, in
+    which case ``flask build-assets`` must have produced it at deploy time.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {'assets': {}, 'pages': {}, 'encodings': {}}
+        self.source_dir = self.pages_dir = self.build_dir = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        frontend = os.path.dirname(app.root_path)
+        self.source_dir = app.config.get('ASSETS_SOURCE_DIR') or os.path.join(frontend, 'static')
+        self.pages_dir = app.config.get('ASSETS_PAGES_DIR') or frontend
+        self.build_dir = app.config.get('ASSETS_BUILD_DIR') or os.path.join(app.instance_path, 'assets')
+        app.extensions['assets'] = self
+        app.add_template_global(asset_url)
+        if app.config.get('ASSETS_BUILD_ON_STARTUP', True):
+            self.build()
+        else:
+            self.load()
+
+    def pages(self):
+        return sorted(
+            os.path.join(self.pages_dir, name) for name in os.listdir(self.pages_dir)
+            if name.endswith('.html')
+        )
+
+    def build(self):
+        if os.path.isdir(self.source_dir):
+            self.manifest = build_assets(self.source_dir, self.build_dir, self.pages())
+        return self.manifest
+
+    def load(self):
+        path = os.path.join(self.build_dir, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        return self.manifest
+
+
+def asset_url(name):
+    """Fingerprinted URL of static asset ``name``."""
+    manifest = current_app.extensions['assets'].manifest
+    return url_for('assets.static_asset', filename=manifest['assets'].get(name, name))
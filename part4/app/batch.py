@@ -0,0 +1,46 @@
+from flask import request, jsonify, current_app
+from marshmallow import ValidationError
+
+DEFAULT_BATCH_MAX_ITEMS = 500
+
+
+class BatchError(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+        self.msg = msg
+
+
+def load_batch(schema):
+    """Validate the JSON array body with a ``many=True`` schema.
+
+    Returns ``(valid, errors)``: ``valid`` is a list of (index, loaded item)
+    and ``errors`` maps the index of each rejected item to its messages.
+    """
+    items = request.get_json(silent=True)
+    if isinstance(items, dict):
+        items = items.get('items')
+    if not isinstance(items, list) or not items:
+        raise BatchError("Body must be a non-empty JSON array")
+    max_items = current_app.config.get('BATCH_MAX_ITEMS', DEFAULT_BATCH_MAX_ITEMS)
+    if len(items) > max_items:
+        raise BatchError("At most %d items per batch" % max_items)
+    try:
+        loaded, errors = schema.load(items), {}
+    except ValidationError as err:
+        loaded, errors = err.valid_data, err.messages
+    valid = [(i, item) for i, item in enumerate(loaded) if i not in errors]
+    return valid, dict(errors)
+
+
+def batch_response(total, created, errors):
+    """Per-item results in request order: 201 with the new id, or 400 with
+    the item's errors. The response is 201 if every item was created, 207
+    if only some were and 400 if none were."""
+    results = []
+    for i in range(total):
+        if i in created:
+            results.append({"index": i, "status": 201, "id": created[i]})
+        else:
+            results.append({"index": i, "status": 400, "errors": errors.get(i)})
+    status = 201 if not errors else (207 if created else 400)
+    return jsonify({"created": len(created), "failed": len(errors), "results": results}), status
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import request, g, current_app, make_response
+
+from app.conditional import not_modified
+
+
+class NullBackend:
+    """Backend that stores nothing; every lookup is a miss."""
+
+    def __init__(self, **options):
+        pass
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        return []
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class LRUBackend:
+    """In-process LRU with a per-entry TTL and a bound on the entry count.
+
+    ``set`` returns the keys it evicted, ``get`` drops expired entries.
+    Callers serialize access.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30, **options):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[0])
+        return evicted
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+BACKENDS = {
+    'lru': LRUBackend,
+    'null': NullBackend,
+}
+
+
+class ResponseCache:
+    """Cache for GET responses keyed on path and normalized query string.
+
+    Entries carry entity tags (``place:<id>``, ``amenities``...) so write
+    handlers can drop exactly the responses that embed what they changed.
+    Invalidation is per process; other workers converge within the TTL.
+    """
+
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self._lock = threading.Lock()
+        self._tags = {}
+        self._key_tags = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'lru')
+        backend_class = BACKENDS[backend] if isinstance(backend, str) else backend
+        self.backend = backend_class(
+            max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024),
+            ttl=app.config.get('RESPONSE_CACHE_TTL', 30),
+        )
+        app.extensions['response_cache'] = self
+
+    @staticmethod
+    def make_key():
+        args = sorted(request.args.items(multi=True))
+        return request.path + ('?' + urlencode(args) if args else '')
+
+    def cached(self, *tags):
+        """Cache a GET view. ``tags`` may reference view arguments, e.g.
+        ``'place:{place_id}'``; the view can add more with ``add_tags``."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = self.make_key()
+                with self._lock:
+                    entry = self.backend.get(key)
+                    self.stats['hits' if entry is not None else 'misses'] += 1
+                    if entry is None:
+                        self._forget(key)  # may have just expired
+                if entry is not None:
+                    status, headers, body, etag, last_modified = entry
+                    cached = not_modified(etag, last_modified) if etag else None
+                    if cached is not None:
+                        return cached
+                    return current_app.response_class(body, status=status, headers=headers)
+
+                g.cache_tags = {tag.format(**kwargs) for tag in tags}
+                response = make_response(view(*args, **kwargs))
+                if (response.status_code == 200 and not response.is_streamed
+                        and g.get('response_cacheable', True)):
+                    etag = response.get_etag()[0]
+                    entry = (response.status_code, list(response.headers), response.get_data(),
+                             etag, response.last_modified and response.last_modified.replace(tzinfo=None))
+                    self._store(key, entry, g.pop('cache_tags'))
+                return response
+            return wrapper
+        return decorator
+
+    def add_tags(self, *tags):
+        if 'cache_tags' in g:
+            g.cache_tags.update(tags)
+
+    def _store(self, key, entry, tags):
+        with self._lock:
+            evicted = self.backend.set(key, entry)
+            self.stats['evictions'] += len(evicted)
+            for old_key in evicted:
+                self._forget(old_key)
+            self._forget(key)
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def _forget(self, key):
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, *tags):
+        """Drop every cached response carrying any of ``tags``."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self.backend.delete(key)
+                    self._forget(key)
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+            self._tags.clear()
+            self._key_tags.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self.backend))
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+import click
+from app.extensions import db, bcrypt, asset_store
+from app.db_pool import pool_stats, pool_status
+from app import sqlite as sqlite_tuning
+from app.query_plans import PLAN_CHECKS, check_query_plans
+from app.models.place import Place
+from app.models.place_location_trigram import reindex_place_locations
+
+
+def register_commands(app):
+    @app.cli.command('calibrate-bcrypt')
+    @click.option('--target-ms', type=int, default=None,
+                  help='Hash latency budget (default: PASSWORD_HASH_TARGET_MS)')
+    def calibrate_bcrypt(target_ms):
+        """Find the largest bcrypt work factor that hashes within the target."""
+        target_ms = target_ms or app.config.get('PASSWORD_HASH_TARGET_MS', 250)
+        chosen = 4
+        for rounds in range(4, 18):
+            start = time.perf_counter()
+            bcrypt.generate_password_hash('calibration-password', rounds)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            click.echo("rounds=%d: %.1f ms" % (rounds, elapsed_ms))
+            if elapsed_ms > target_ms:
+                break
+            chosen = rounds
+        click.echo("BCRYPT_LOG_ROUNDS=%d" % chosen)
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        """Recompute stored place rating aggregates from the review table."""
+        Place.rebuild_rating_aggregates()
+        db.session.commit()
+        click.echo("Rating aggregates rebuilt for %d places" % Place.query.count())
+
+    @app.cli.command('reindex-locations')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def reindex_locations(batch_size):
+        """Rebuild the place location trigram index from the places table."""
+        total = 0
+        last_id = ''
+        while True:
+            batch = (
+                db.session.query(Place.id, Place.location)
+                .filter(Place.id > last_id)
+                .order_by(Place.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            reindex_place_locations(db.session.connection(), batch)
+            db.session.commit()
+            total += len(batch)
+            last_id = batch[-1][0]
+        click.echo("Location index rebuilt for %d places" % total)
+
+    @app.cli.command('pool-loadtest')
+    @click.option('--threads', type=int, default=None,
+                  help='Concurrent request threads (default: pool_size + max_overflow)')
+    @click.option('--requests', 'per_thread', default=200, show_default=True,
+                  help='Requests per thread')
+    @click.option('--hold-ms', default=5.0, show_default=True,
+                  help='How long each request keeps its connection')
+    def pool_loadtest(threads, per_thread, hold_ms):
+        """Hammer the connection pool from concurrent threads and report waits."""
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        if threads is None:
+            threads = options.get('pool_size', 5) + options.get('max_overflow', 10)
+        errors = []
+
+        def worker():
+            for _ in range(per_thread):
+                with app.app_context():
+                    try:
+                        db.session.execute(db.text('SELECT 1'))
+                        time.sleep(hold_ms / 1000)
+                    except Exception as e:
+                        errors.append(e)
+                    finally:
+                        db.session.remove()
+
+        pool_stats.reset()
+        start = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        status = pool_status(db.engine)
+        click.echo("%d threads x %d requests in %.2f s (%.0f req/s)" % (
+            threads, per_thread, elapsed, threads * per_thread / elapsed))
+        for key, value in status.items():
+            click.echo("  %s: %s" % (key, value))
+        if errors:
+            click.echo("%d requests failed, first: %s" % (len(errors), errors[0]))
+            raise SystemExit(1)
+
+    @app.cli.command('sync-sqlite-replica')
+    def sync_sqlite_replica():
+        """Copy the primary SQLite database over the replica (local testing)."""
+        primary, replica = db.engines[None], db.engines.get('replica')
+        if replica is None or primary.url.get_backend_name() != 'sqlite' \
+                or replica.url.get_backend_name() != 'sqlite':
+            click.echo("Both the primary and the replica bind must be SQLite files")
+            raise SystemExit(1)
+        replica.dispose()
+        source = sqlite3.connect(primary.url.database)
+        target = sqlite3.connect(replica.url.database)
+        with target:
+            source.backup(target)
+        source.close()
+        target.close()
+        click.echo("Copied %s to %s" % (primary.url.database, replica.url.database))
+
+    @app.cli.command('sqlite-optimize')
+    @click.option('--analyze', is_flag=True, help='Run a full ANALYZE instead of PRAGMA optimize')
+    def sqlite_optimize(analyze):
+        """Refresh SQLite planner statistics and truncate the WAL (run periodically)."""
+        for key, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            with engine.begin() as connection:
+                busy, log, checkpointed = sqlite_tuning.optimize(connection, analyze)
+            click.echo("%s: %s, WAL checkpoint %d/%d pages%s" % (
+                key or 'default', 'analyzed' if analyze else 'optimized',
+                checkpointed, log, ' (busy)' if busy else ''))
+
+    @app.cli.command('check-query-plans')
+    def check_plans():
+        """EXPLAIN every query of the read endpoints; fail on full table scans."""
+        problems = check_query_plans(app)
+        for path, table, statement in problems:
+            click.echo("%s: full scan of %s\n    %s" % (path, table, ' '.join(statement.split())))
+        if problems:
+            raise SystemExit(1)
+        click.echo("No unexpected full scans across %d endpoints" % len(PLAN_CHECKS))
+
+    @app.cli.command('build-assets')
+    def build_assets():
+        """Fingerprint and precompress the frontend pages and static assets."""
+        manifest = asset_store.build()
+        for name, built in sorted(manifest['assets'].items()):
+            click.echo("%s -> %s %s" % (name, built, ' '.join(manifest['encodings'][built])))
+        for name in sorted(manifest['pages']):
+            click.echo("%s %s" % (name, ' '.join(manifest['encodings'][name])))
+        click.echo("Built into %s" % asset_store.build_dir)
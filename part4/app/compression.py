@@ -0,0 +1,130 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'application/javascript', 'text/css', 'text/html',
+    'text/javascript', 'text/plain', 'image/svg+xml',
+)
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _gzip_chunks(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip framing
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _brotli_chunks(chunks, level):
+    compressor = brotli.Compressor(quality=level)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+# Content-Encoding -> (whole body, streamed body), in server preference order
+ENCODERS = {
+    'br': (_brotli, _brotli_chunks),
+    'gzip': (_gzip, _gzip_chunks),
+}
+
+
+def available_encodings(wanted=('br', 'gzip')):
+    return tuple(e for e in wanted if e in ENCODERS and (e != 'br' or brotli is not None))
+
+
+def negotiate(encodings):
+    """The encoding among ``encodings`` the client accepts with the highest
+    q-value (ties go to the earlier one), or None for identity."""
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+    """Content-negotiated compression of dynamic responses.
+
+    Bodies of a compressible type and at least ``COMPRESS_MIN_SIZE`` bytes
+    are gzip/brotli encoded per Accept-Encoding; streamed bodies are
+    compressed chunk by chunk. Files (``direct_passthrough``) and responses
+    that already carry a Content-Encoding, like the precompressed static
+    assets, pass through untouched.
+    """
+
+    def __init__(self, app=None):
+        self.encodings = ()
+        self.levels = {}
+        self.min_size = 1024
+        self.mimetypes = COMPRESSIBLE_MIMETYPES
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.encodings = available_encodings(app.config.get('COMPRESS_ENCODINGS', ('br', 'gzip')))
+        self.levels = {
+            'br': app.config.get('COMPRESS_BR_LEVEL', 4),
+            'gzip': app.config.get('COMPRESS_GZIP_LEVEL', 6),
+        }
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.mimetypes = app.config.get('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES)
+        app.extensions['compressor'] = self
+        if self.encodings:
+            app.after_request(self._compress)
+
+    def _compress(self, response):
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code == 304:
+            # Compressed 200s carry weak ETags; revalidate them the same way
+            if negotiate(self.encodings):
+                response.vary.add('Accept-Encoding')
+                self._weaken_etag(response)
+            return response
+        if (response.status_code < 200 or response.status_code in (204, 206)
+                or response.mimetype not in self.mimetypes):
+            return response
+        if not response.is_streamed and response.calculate_content_length() < self.min_size:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(self.encodings)
+        if encoding is None:
+            return response
+        compress, compress_chunks = ENCODERS[encoding]
+        level = self.levels[encoding]
+        if response.is_streamed:
+            response.response = compress_chunks(response.iter_encoded(), level)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress(response.get_data(), level))
+        response.headers['Content-Encoding'] = encoding
+        self._weaken_etag(response)
+        return response
+
+    @staticmethod
+    def _weaken_etag(response):
+        # The encoded bytes are a different representation of the same
+        # resource: keep the validator, but only as a weak one.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
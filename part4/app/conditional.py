@@ -0,0 +1,38 @@
+import hashlib
+from datetime import datetime, timezone
+from flask import request, current_app
+
+
+def validators(*parts):
+    """Strong ETag over ``parts`` and Last-Modified from the newest datetime
+    among them. Callers pass cheap row versions (ids, counts, updated_at),
+    never the serialized body."""
+    etag = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    stamps = [p for p in parts if isinstance(p, datetime)]
+    return etag, max(stamps) if stamps else None
+
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the request's conditional headers match, else None.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    and uses the weak comparison, so the weak ETags of compressed responses
+    still match.
+    """
+    matched = False
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        stamp = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        matched = stamp <= request.if_modified_since
+    if not matched:
+        return None
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return response
@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Process-wide counters for connection checkouts.
+
+    Kept at module level rather than on the pool, because the engine builds
+    a fresh pool on dispose() and the counters should outlive it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.slow_checkout_ms = 100
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkouts += not timed_out
+            self.timeouts += timed_out
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+        if seconds * 1000 >= self.slow_checkout_ms:
+            logger.warning("Waited %.1f ms for a database connection%s",
+                           seconds * 1000, " (timed out)" if timed_out else "")
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total * 1000 / attempts, 3) if attempts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def pool_status(engine):
+    """Checkout counters plus the current in-use/overflow gauges of the pool."""
+    status = pool_stats.snapshot()
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    return status
+
+
+def init_pool_stats(app):
+    pool_stats.slow_checkout_ms = app.config.get('DB_POOL_SLOW_CHECKOUT_MS', 100)
@@ -1,5 +1,6 @@
 from flask import jsonify
 from marshmallow import ValidationError
+from app.passwords import PasswordHasherBusy
 
 def register_error_handlers(app):
     @app.errorhandler(400)
@@ -26,6 +27,10 @@ def register_error_handlers(app):
     def internal_server_error(e):
         return jsonify({"msg": "Internal server error"}), 500
 
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(e):
+        return jsonify({"msg": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
     @app.errorhandler(ValidationError)
     def handle_marshmallow_validation(err):
         return jsonify({"errors": err.messages}), 400
\ No newline at end of file
@@ -2,8 +2,20 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
+from app.assets import AssetStore
+from app.cache import ResponseCache
+from app.compression import Compressor
+from app.metrics import RequestMetrics
+from app.passwords import PasswordHasher
+from app.replica import RoutingSession, ReplicaRouter
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
 migrate = Migrate()
+response_cache = ResponseCache()
+password_hasher = PasswordHasher()
+replica_router = ReplicaRouter()
+compressor = Compressor()
+asset_store = AssetStore()
+request_metrics = RequestMetrics()
@@ -0,0 +1,124 @@
+from flask import request
+
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.place_amenity import place_amenity
+from app.models.review import Review, FEED_FIELDS
+from app.models.user import User
+
+# Every field ?fields= may select on a place, with the columns behind it
+PLACE_FIELDS = {
+    'id': ('id',),
+    'name': ('name',),
+    'description': ('description',),
+    'price': ('price',),
+    'location': ('location',),
+    'latitude': ('latitude',),
+    'longitude': ('longitude',),
+    'owner_id': ('owner_id',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+    'review_count': ('review_count',),
+    'avg_rating': ('avg_rating', 'review_count'),
+    'rating_histogram': tuple('rating_%d_count' % rating for rating in range(1, 6)),
+}
+SUMMARY_FIELDS = ('id', 'name', 'price', 'location', 'latitude', 'longitude', 'review_count', 'avg_rating')
+INCLUDES = ('amenities', 'owner', 'reviews')
+
+
+def _parse_list(name, allowed, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    names = [n.strip() for n in value.split(',') if n.strip()]
+    unknown = [n for n in names if n not in allowed]
+    if unknown:
+        raise ValueError("Unknown %s: %s (allowed: %s)" % (name, ', '.join(unknown), ', '.join(allowed)))
+    return tuple(dict.fromkeys(names))
+
+
+def parse_fields(allowed, default):
+    """``?fields=a,b`` as a tuple that always starts with id, or ``default``."""
+    fields = _parse_list('fields', allowed, default)
+    return fields if fields[:1] == ('id',) else ('id',) + tuple(f for f in fields if f != 'id')
+
+
+def parse_include(default=None):
+    """``?include=amenities,owner,reviews`` as a tuple, or ``default``."""
+    return _parse_list('include', INCLUDES, default)
+
+
+def place_columns(fields, extra=()):
+    """Place columns needed to render ``fields`` (plus ``extra`` columns)."""
+    names = dict.fromkeys(c for f in fields for c in PLACE_FIELDS[f])
+    names.update(dict.fromkeys(extra))
+    return [getattr(Place, name) for name in names]
+
+
+def with_owner(query):
+    """Add the owner's display name columns to a place column query."""
+    return query.add_columns(
+        User.id.label('owner_user_id'), User.first_name, User.last_name, User.email
+    ).outerjoin(User, Place.owner_id == User.id)
+
+
+def place_dict(row, fields):
+    """Render ``fields`` of a place from a column row (or a Place)."""
+    data = {}
+    for field in fields:
+        if field == 'review_count':
+            data[field] = row.review_count or 0
+        elif field == 'avg_rating':
+            data[field] = round(row.avg_rating, 2) if row.review_count else None
+        elif field == 'rating_histogram':
+            data[field] = {
+                str(rating): getattr(row, 'rating_%d_count' % rating) or 0
+                for rating in range(1, 6)
+            }
+        else:
+            data[field] = getattr(row, field)
+    return data
+
+
+def owner_dict(row):
+    if row.owner_user_id is None:
+        return None
+    return {
+        "id": row.owner_user_id,
+        "name": User.format_display_name(row.first_name, row.last_name, row.email),
+    }
+
+
+def attach_includes(items, rows, include, review_fields=FEED_FIELDS):
+    """Add the ``include``d relations to rendered places, one query per
+    relation for the whole set. ``rows`` come from a query built with
+    ``with_owner`` when owner is included. Returns the cache tags of
+    everything embedded."""
+    ids = [item['id'] for item in items]
+    tags = []
+    if 'owner' in include:
+        for item, row in zip(items, rows):
+            item['owner'] = owner_dict(row)
+            if item['owner']:
+                tags.append('user:%s' % item['owner']['id'])
+    if 'amenities' in include:
+        by_place = {}
+        attached = (
+            db.session.query(place_amenity.c.place_id, Amenity.id, Amenity.name, Amenity.description)
+            .join(Amenity, place_amenity.c.amenity_id == Amenity.id)
+            .filter(place_amenity.c.place_id.in_(ids))
+        ) if ids else []
+        for place_id, amenity_id, name, description in attached:
+            by_place.setdefault(place_id, []).append(
+                {"id": amenity_id, "name": name, "description": description})
+            tags.append('amenity:%s' % amenity_id)
+        for item in items:
+            item['amenities'] = by_place.get(item['id'], [])
+    if 'reviews' in include:
+        authors = set()
+        feeds = Review.feeds(ids, review_fields, authors) if ids else {}
+        for item in items:
+            item['reviews'] = feeds.get(item['id'], [])
+        tags.extend('user:%s' % user_id for user_id in authors)
+    return tags
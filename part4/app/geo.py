@@ -0,0 +1,80 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Places are bucketed into a fixed lat/lon grid. A cell id is
+# row * LON_CELLS + col, so the cells of one grid row that fall inside a
+# bounding box form a contiguous id range and a box query becomes one
+# BETWEEN per row on the indexed geo_cell column.
+CELL_DEGREES = 0.1
+LAT_CELLS = int(round(180 / CELL_DEGREES))
+LON_CELLS = int(round(360 / CELL_DEGREES))
+
+
+def _row(lat):
+    return min(max(int((lat + 90) / CELL_DEGREES), 0), LAT_CELLS - 1)
+
+
+def _col(lon):
+    return min(max(int((lon + 180) / CELL_DEGREES), 0), LON_CELLS - 1)
+
+
+def cell_id(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return _row(lat) * LON_CELLS + _col(lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat, lon, radius_km):
+    """Bounding boxes (min_lat, min_lon, max_lat, max_lon) covering a circle.
+
+    Returns two boxes when the circle crosses the antimeridian.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    ratio = None
+    if -90 < min_lat and max_lat < 90:
+        ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+    if ratio is None or ratio >= 1:
+        # The circle reaches a pole: every longitude is in range
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+    dlon = math.degrees(math.asin(ratio))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        return [(min_lat, min_lon + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def split_bbox(min_lat, min_lon, max_lat, max_lon):
+    """Boxes for a bbox, split in two if it crosses the antimeridian."""
+    if min_lon > max_lon:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def cell_ranges(boxes, max_ranges=256):
+    """Inclusive (first, last) geo_cell ranges covering the given boxes.
+
+    Past ``max_ranges`` rows each box collapses to the single range between
+    its first and last cell, a superset the caller's exact test trims.
+    """
+    ranges = []
+    for min_lat, min_lon, max_lat, max_lon in boxes:
+        first_row, last_row = _row(min_lat), _row(max_lat)
+        first_col, last_col = _col(min_lon), _col(max_lon)
+        if last_row - first_row + 1 > max_ranges:
+            ranges.append((first_row * LON_CELLS + first_col, last_row * LON_CELLS + last_col))
+            continue
+        for row in range(first_row, last_row + 1):
+            ranges.append((row * LON_CELLS + first_col, row * LON_CELLS + last_col))
+    return ranges
@@ -0,0 +1,32 @@
+from collections import namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+Identity = namedtuple('Identity', ['id', 'email', 'is_admin', 'name'])
+
+
+def identity_claims(user):
+    """Additional JWT claims that let handlers authorize and attribute
+    writes without reloading the user. They can be stale for at most
+    JWT_ACCESS_TOKEN_EXPIRES."""
+    return {
+        "email": user.email,
+        "is_admin": user.is_admin,
+        "name": user.display_name
+    }
+
+
+def current_identity():
+    """Identity of the verified JWT, built once per request (per token)."""
+    claims = get_jwt()
+    identity = g.get('identity')
+    if identity is None or g.get('identity_jti') != claims.get('jti'):
+        identity = Identity(
+            id=get_jwt_identity(),
+            email=claims.get('email'),
+            is_admin=bool(claims.get('is_admin')),
+            name=claims.get('name') or claims.get('email')
+        )
+        g.identity = identity
+        g.identity_jti = claims.get('jti')
+    return identity
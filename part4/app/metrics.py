@@ -0,0 +1,183 @@
+import hmac
+import os
+import time
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+UNMATCHED = '<unmatched>'
+STATE_KEY = 'hbnb.metrics'
+
+# Process-wide, like the default registry they live in. With
+# PROMETHEUS_MULTIPROC_DIR set before prometheus_client is imported, every
+# worker writes them to its own mmapped file and /metrics sums the files.
+
+# The _count series doubles as the request count per route and status
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time from routing to the response being finalized',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests being handled', ['method', 'route'],
+    multiprocess_mode='livesum')
+REQUEST_SIZE = Histogram(
+    'http_request_size_bytes', 'Request body size, for requests with a body',
+    ['method', 'route'], buckets=SIZE_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size as sent, after compression',
+    ['method', 'route'], buckets=SIZE_BUCKETS)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+class _RouteMetrics:
+    """Label children of one (method, route), resolved once and reused."""
+
+    __slots__ = ('labels', 'in_flight', 'request_size', 'response_size', 'latency')
+
+    def __init__(self, method, route):
+        self.labels = (method, route)
+        self.in_flight = IN_FLIGHT.labels(method, route)
+        self.request_size = REQUEST_SIZE.labels(method, route)
+        self.response_size = RESPONSE_SIZE.labels(method, route)
+        self.latency = {}  # status code -> LATENCY child
+
+    def latency_for(self, status):
+        child = self.latency.get(status)
+        if child is None:
+            child = self.latency.setdefault(status, LATENCY.labels(*self.labels, status))
+        return child
+
+
+class RequestMetrics:
+    """Records request counts, latency, in-flight and body sizes per route.
+
+    The route label is the URL rule (``/api/v1/places/<place_id>``), so the
+    number of series stays bounded by the number of routes; an endpoint
+    served by several rules is labelled with the first one registered. The
+    first request resolves the label children of every (endpoint, method)
+    of the URL map at once, so each request after that costs one dict
+    lookup, two histogram observations and a gauge increment and decrement,
+    plus one more observation with a body.
+
+    That is about 9 to 11 us single-process and 16 to 19 us in multiprocess
+    mode (bench/metrics_overhead.py), well above the few microseconds first
+    aimed for. The hooks themselves take 3 to 4 us of it. The rest is
+    prometheus_client: about 6 us for the four updates, each taking a lock,
+    and about 15 us when every update is a write to the worker's mmapped
+    file. It cannot get much cheaper without dropping one of the metrics.
+    """
+
+    def __init__(self, app=None):
+        # (endpoint, method) -> _RouteMetrics, or None for /metrics. The
+        # endpoint is None for requests that matched no rule.
+        self._routes = {}
+        self.enabled = False
+        self.token = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        self.token = app.config.get('METRICS_BEARER_TOKEN')
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+        # First before_request and last after_request: runs even when a later
+        # before_request answers, and sees the final (compressed) body.
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._record)
+        app.teardown_request(self._finish)
+
+    def _prepare(self, url_map):
+        for rule in url_map.iter_rules():
+            for method in rule.methods:
+                key = (rule.endpoint, method)
+                if key not in self._routes:
+                    self._routes[key] = self._route_for(rule.endpoint, rule.rule, method)
+
+    @staticmethod
+    def _route_for(endpoint, rule, method):
+        if endpoint == 'metrics.metrics':
+            return None
+        return _RouteMetrics(method if method in METHODS else 'OTHER', rule)
+
+    def _resolve(self, rule, method):
+        """Label children for a key not resolved yet: the whole URL map on
+        the first request, then unmatched requests and unusual methods."""
+        if not self._routes:
+            self._prepare(current_app.url_map)
+        endpoint = rule.endpoint if rule is not None else None
+        route = self._routes.get((endpoint, method))
+        if route is None and (endpoint, method) not in self._routes:
+            route = self._route_for(endpoint, rule.rule if rule is not None else UNMATCHED, method)
+            route = self._routes.setdefault((endpoint, method), route)
+        return route
+
+    # The hooks resolve the request proxy once and work on the object and
+    # its environ: each attribute read through the proxy, or a parsed
+    # property like content_length, costs about as much as a metric update.
+    def _start(self):
+        req = request._get_current_object()
+        rule = req.url_rule
+        environ = req.environ
+        method = environ['REQUEST_METHOD']
+        try:
+            route = self._routes[rule.endpoint if rule is not None else None, method]
+        except KeyError:
+            route = self._resolve(rule, method)
+        if route is None:
+            return
+        route.in_flight.inc()
+        environ[STATE_KEY] = (route, time.perf_counter())
+
+    def _record(self, response):
+        environ = request._get_current_object().environ
+        state = environ.get(STATE_KEY)
+        if state is None:
+            return response
+        route, start = state
+        route.latency_for(response.status_code).observe(time.perf_counter() - start)
+        content_length = environ.get('CONTENT_LENGTH')
+        if content_length and content_length.isdigit() and content_length != '0':
+            route.request_size.observe(int(content_length))
+        # Streamed bodies have no Content-Length and are not counted
+        size = response.headers.get('Content-Length')
+        if size is not None and size.isdigit():
+            route.response_size.observe(int(size))
+        return response
+
+    def _finish(self, exc):
+        state = request._get_current_object().environ.pop(STATE_KEY, None)
+        if state is not None:
+            state[0].in_flight.dec()
+
+    def authorized(self):
+        if not self.token:
+            return True
+        supplied = request.headers.get('Authorization', '')
+        return hmac.compare_digest(supplied.encode(), ('Bearer ' + self.token).encode())
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    exporter = current_app.extensions['metrics']
+    if not exporter.enabled:
+        abort(404)
+    if not exporter.authorized():
+        return jsonify({"msg": "Unauthorized"}), 401
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
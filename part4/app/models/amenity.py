@@ -1,10 +1,10 @@
 from app.extensions import db
+from app.ids import new_id
 from datetime import datetime
-import uuid
 
 class Amenity(db.Model):
     __tablename__ = 'amenity'
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
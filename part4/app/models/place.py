@@ -1,24 +1,192 @@
-import uuid
+from datetime import datetime
+from sqlalchemy import event
 from app.models.place_amenity import place_amenity
+from app.models.place_location_trigram import place_location_trigram, reindex_place_locations, normalize_location
 from app.extensions import db
+from app.ids import new_id
+from app.geo import cell_id
 
 class Place(db.Model):
     __tablename__ = 'places'
-    id = db.Column(db.String(60), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
     name = db.Column(db.String(128), nullable=False)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
     location = db.Column(db.String(128))
+    # normalize_location(location), kept in sync on flush. Search confirms
+    # substrings against it: SQL lower() only folds ASCII on SQLite.
+    location_normalized = db.Column(db.String(128))
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
-    owner_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False)
+    # Grid cell of (latitude, longitude), see app.geo; kept in sync on flush
+    geo_cell = db.Column(db.Integer, index=True)
+    owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Rating aggregates, maintained by apply_rating_change() in the same
+    # transaction as every review write; rebuild with `flask rebuild-ratings`.
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    avg_rating = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     amenities = db.relationship('Amenity', secondary=place_amenity, backref=db.backref('places', lazy='dynamic'), lazy='dynamic')
 
     # --- ADD THIS LINE ---
     reviews = db.relationship('Review', backref='place', lazy='dynamic')
 
-    def to_dict(self):
+    __table_args__ = (
+        db.Index('ix_places_avg_rating_id', 'avg_rating', 'id'),
+    )
+
+    @classmethod
+    def relation_version_columns(cls, include=('owner', 'amenities', 'reviews')):
+        """Correlated scalar subqueries that change whenever one of the
+        ``include``d relations of a place does."""
+        from app.models.amenity import Amenity
+        from app.models.review import Review
+        from app.models.user import User
+
+        def attached(expr):
+            return (
+                db.select(expr)
+                .join(place_amenity, place_amenity.c.amenity_id == Amenity.id)
+                .where(place_amenity.c.place_id == cls.id)
+                .scalar_subquery()
+            )
+
+        columns = []
+        if 'owner' in include:
+            owner = db.aliased(User)
+            columns.append(db.select(owner.updated_at).where(owner.id == cls.owner_id).scalar_subquery())
+        if 'amenities' in include:
+            columns += [attached(db.func.count(Amenity.id)), attached(db.func.max(Amenity.updated_at))]
+        if 'reviews' in include:
+            columns += Review.feed_version_columns(cls.id)
+        return columns
+
+    @classmethod
+    def detail_version(cls, place_id, include=('owner', 'amenities', 'reviews')):
+        """Row versions behind the place detail payload, in one query, or
+        None if the place does not exist."""
+        return (
+            db.session.query(cls.updated_at, *cls.relation_version_columns(include))
+            .filter(cls.id == place_id)
+            .first()
+        )
+
+    @classmethod
+    def histogram_column(cls, rating):
+        return getattr(cls, 'rating_%d_count' % rating)
+
+    @classmethod
+    def apply_rating_change(cls, place_id, added=None, removed=None):
+        """Adjust the stored aggregates for one review written, edited or
+        deleted. Runs as a single relative UPDATE in the caller's transaction,
+        so concurrent review writes cannot lose each other's increments.
+        """
+        cls.apply_rating_changes(
+            place_id,
+            added=() if added is None else (added,),
+            removed=() if removed is None else (removed,),
+        )
+
+    @classmethod
+    def apply_rating_changes(cls, place_id, added=(), removed=()):
+        """Like apply_rating_change() for any number of ratings at once, still
+        as one UPDATE per place (used by the batch review endpoint)."""
+        count_delta = len(added) - len(removed)
+        sum_delta = sum(added) - sum(removed)
+        star_deltas = {}
+        for rating in added:
+            star_deltas[rating] = star_deltas.get(rating, 0) + 1
+        for rating in removed:
+            star_deltas[rating] = star_deltas.get(rating, 0) - 1
+
+        # avg_rating comes first and is computed from the old values: MySQL
+        # applies SET assignments left to right, other backends all at once.
+        new_count = cls.review_count + count_delta
+        values = [
+            (cls.avg_rating, db.func.coalesce(
+                (cls.rating_sum + sum_delta) * 1.0 / db.func.nullif(new_count, 0), 0)),
+            (cls.review_count, new_count),
+            (cls.rating_sum, cls.rating_sum + sum_delta),
+        ]
+        for rating, delta in star_deltas.items():
+            if delta:
+                column = cls.histogram_column(rating)
+                values.append((column, column + delta))
+        db.session.execute(
+            db.update(cls.__table__).where(cls.id == place_id).ordered_values(*values)
+        )
+
+    @classmethod
+    def bulk_insert(cls, rows):
+        """Insert many places as one executemany and return their ids.
+
+        Mapper events do not fire for bulk inserts, so the geo cell and the
+        location trigram rows are filled in here instead.
+        """
+        now = datetime.utcnow()
+        for row in rows:
+            row.setdefault('id', new_id())
+            row.setdefault('created_at', now)
+            row.setdefault('updated_at', now)
+            row['geo_cell'] = cell_id(row.get('latitude'), row.get('longitude'))
+            row['location_normalized'] = normalize_location(row.get('location'))
+        db.session.execute(db.insert(cls), rows)
+        reindex_place_locations(
+            db.session.connection(),
+            [(row['id'], row.get('location')) for row in rows if row.get('location')]
+        )
+        return [row['id'] for row in rows]
+
+    @classmethod
+    def rebuild_rating_aggregates(cls):
+        """Recompute every place's aggregates from the review table."""
+        from app.models.review import Review
+
+        def per_place(expr):
+            return (
+                db.select(expr)
+                .where(Review.place_id == cls.id)
+                .scalar_subquery()
+            )
+
+        values = {
+            cls.review_count: per_place(db.func.count(Review.id)),
+            cls.rating_sum: per_place(db.func.coalesce(db.func.sum(Review.rating), 0)),
+            cls.avg_rating: per_place(db.func.coalesce(db.func.avg(Review.rating), 0)),
+        }
+        for rating in range(1, 6):
+            values[cls.histogram_column(rating)] = per_place(
+                db.func.coalesce(db.func.sum(db.case((Review.rating == rating, 1), else_=0)), 0)
+            )
+        db.session.execute(db.update(cls.__table__).values(values))
+
+    def rating_summary(self):
+        return {
+            "review_count": self.review_count or 0,
+            "avg_rating": round(self.avg_rating, 2) if self.review_count else None,
+        }
+
+    def to_summary_dict(self):
+        """Listing representation: no description and no embedded reviews."""
         return {
+            "id": self.id,
+            "name": self.name,
+            "price": self.price,
+            "location": self.location,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            **self.rating_summary(),
+        }
+
+    def to_dict(self, include_reviews=True):
+        data = {
             "id": self.id,
             "name": self.name,
             "description": self.description,
@@ -27,6 +195,35 @@ class Place(db.Model):
             "latitude": self.latitude,
             "longitude": self.longitude,
             "owner_id": self.owner_id,
-            # --- ADD THIS LINE ---
-            "reviews": [review.to_dict() for review in self.reviews]
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            **self.rating_summary(),
+            "rating_histogram": {
+                str(rating): getattr(self, 'rating_%d_count' % rating) or 0
+                for rating in range(1, 6)
+            },
         }
+        if include_reviews:
+            data["reviews"] = [review.to_dict() for review in self.reviews]
+        return data
+
+
+@event.listens_for(Place, 'before_insert')
+@event.listens_for(Place, 'before_update')
+def _sync_derived_columns(mapper, connection, target):
+    target.geo_cell = cell_id(target.latitude, target.longitude)
+    target.location_normalized = normalize_location(target.location)
+
+
+@event.listens_for(Place, 'after_insert')
+@event.listens_for(Place, 'after_update')
+def _sync_location_index(mapper, connection, target):
+    if db.inspect(target).attrs.location.history.has_changes():
+        reindex_place_locations(connection, [(target.id, target.location)])
+
+
+@event.listens_for(Place, 'before_delete')
+def _drop_location_index(mapper, connection, target):
+    connection.execute(
+        place_location_trigram.delete().where(place_location_trigram.c.place_id == target.id)
+    )
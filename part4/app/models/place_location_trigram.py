@@ -0,0 +1,74 @@
+import sys
+
+from app.extensions import db
+
+# Inverted index over lowercased place locations: one row per distinct
+# trigram of each location, so substring searches become index lookups on
+# `trigram` instead of a leading-wildcard LIKE over every place.
+place_location_trigram = db.Table('place_location_trigram',
+    db.Column('trigram', db.String(3), primary_key=True),
+    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True, index=True)
+)
+
+
+def normalize_location(text):
+    return (text or '').lower()
+
+
+def location_trigrams(text):
+    """Distinct trigrams of a location. The end is padded with two spaces so
+    that every 1- or 2-character substring is the prefix of some trigram."""
+    text = normalize_location(text)
+    padded = text + '  '
+    return {padded[i:i + 3] for i in range(len(text))}
+
+
+def reindex_place_locations(connection, places):
+    """Replace the index rows of ``places``, an iterable of (id, location)."""
+    places = list(places)
+    if not places:
+        return
+    connection.execute(
+        place_location_trigram.delete().where(
+            place_location_trigram.c.place_id.in_([place_id for place_id, _ in places]))
+    )
+    rows = [
+        {"trigram": trigram, "place_id": place_id}
+        for place_id, location in places
+        for trigram in location_trigrams(location)
+    ]
+    if rows:
+        connection.execute(place_location_trigram.insert(), rows)
+
+
+def location_candidates(term):
+    """Select of place ids whose location may contain ``term``.
+
+    Terms of three or more characters must match every one of their trigrams;
+    the caller still confirms the substring on this (small) candidate set.
+    Shorter terms are an exact prefix range scan over the trigram index.
+    """
+    term = normalize_location(term)
+    t = place_location_trigram.c
+    if len(term) >= 3:
+        grams = {term[i:i + 3] for i in range(len(term) - 2)}
+        return (
+            db.select(t.place_id)
+            .where(t.trigram.in_(grams))
+            .group_by(t.place_id)
+            .having(db.func.count() == len(grams))
+        )
+    condition = t.trigram >= term
+    upper = _prefix_successor(term)
+    if upper is not None:
+        condition = db.and_(condition, t.trigram < upper)
+    return db.select(t.place_id).where(condition).distinct()
+
+
+def _prefix_successor(prefix):
+    """Smallest string above every string starting with ``prefix``, or None
+    if there is none (the prefix is all U+10FFFF)."""
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return None
+    return stem[:-1] + chr(ord(stem[-1]) + 1)
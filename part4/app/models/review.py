@@ -1,10 +1,16 @@
 from app.extensions import db
+from app.ids import new_id
 from datetime import datetime
-import uuid
+
+# Fields of a review in place feeds, and every field ?fields= may ask for
+FEED_FIELDS = ('id', 'text', 'rating', 'user_id', 'user_name')
+REVIEW_FIELDS = FEED_FIELDS + ('place_id', 'created_at', 'updated_at')
+# Place ids per feeds() query, well under SQLite's bound parameter limit
+FEED_CHUNK_SIZE = 500
 
 class Review(db.Model):
     __tablename__ = 'review'
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -14,6 +20,8 @@ class Review(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'place_id', name='unique_user_place_review'),
+        # Review feeds: filter on place_id, read in created_at order
+        db.Index('ix_review_place_id_created_at', 'place_id', 'created_at'),
     )
 
     # --- ADD THIS METHOD ---
@@ -24,6 +32,74 @@ class Review(db.Model):
             "rating": self.rating,
             "user_id": self.user_id,
             "place_id": self.place_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+    def to_dict_with_author(self, user_name):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "rating": self.rating,
+            "user_id": self.user_id,
+            "user_name": user_name
         }
+
+    @classmethod
+    def feeds(cls, place_ids, fields=FEED_FIELDS, authors=None):
+        """Reviews of ``place_ids`` in created_at order, grouped by place id,
+        in one query per FEED_CHUNK_SIZE places that selects only ``fields``.
+        ``user_name`` is the author's display name. ``authors``, when given,
+        is a set that collects the author ids (for cache tags) whether or not
+        ``user_id`` is one of the fields."""
+        from app.models.user import User
+        with_author = 'user_name' in fields
+        columns = [getattr(cls, f).label(f) for f in fields if f != 'user_name']
+        query = db.session.query(cls.place_id.label('feed_place_id'),
+                                 cls.user_id.label('feed_user_id'), *columns)
+        if with_author:
+            query = query.add_columns(
+                User.id.label('author_id'), User.first_name, User.last_name, User.email
+            ).outerjoin(User, cls.user_id == User.id)
+        place_ids = list(place_ids)
+        rows = (
+            row
+            for first in range(0, len(place_ids), FEED_CHUNK_SIZE)
+            for row in query.filter(cls.place_id.in_(place_ids[first:first + FEED_CHUNK_SIZE]))
+            .order_by(cls.created_at)
+        )
+
+        feeds = {}
+        for row in rows:
+            item = {f: getattr(row, f) for f in fields if f != 'user_name'}
+            if with_author:
+                item['user_name'] = (
+                    User.format_display_name(row.first_name, row.last_name, row.email)
+                    if row.author_id else "Anonymous"
+                )
+            if authors is not None and row.feed_user_id:
+                authors.add(row.feed_user_id)
+            feeds.setdefault(row.feed_place_id, []).append(item)
+        return feeds
+
+    @classmethod
+    def list_with_authors(cls, place_id, fields=FEED_FIELDS, authors=None):
+        """Reviews of a place joined to their authors in a single query."""
+        return cls.feeds([place_id], fields, authors).get(place_id, [])
+
+    @classmethod
+    def feed_version_columns(cls, place_id):
+        """Scalar subqueries that change whenever the review feed of
+        ``place_id`` does: review count, newest review edit and newest edit
+        of any author. ``place_id`` may be a value or a correlated column."""
+        from app.models.user import User
+        # Aliased so it never correlates with a users table in the outer query
+        author = db.aliased(User)
+        return [
+            db.select(db.func.count(cls.id)).where(cls.place_id == place_id).scalar_subquery(),
+            db.select(db.func.max(cls.updated_at)).where(cls.place_id == place_id).scalar_subquery(),
+            db.select(db.func.max(author.updated_at))
+            .join(cls, cls.user_id == author.id)
+            .where(cls.place_id == place_id)
+            .scalar_subquery(),
+        ]
@@ -1,13 +1,22 @@
-from app.extensions import db, bcrypt
+from app.extensions import db, password_hasher
+from app.ids import new_id
 from datetime import datetime
-import uuid
+from sqlalchemy import event
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
 
 class User(db.Model):
     __tablename__ = 'users'
-    id = db.Column(db.String(60), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(128), nullable=False, unique=True)
+    # normalize_email(email), kept in sync on flush; all lookups by email go
+    # through this column so they are unique index seeks
+    email_normalized = db.Column(db.String(128), nullable=False, unique=True, index=True)
     password = db.Column(db.String(128), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -15,11 +24,29 @@ class User(db.Model):
     places = db.relationship('Place', backref='owner', lazy=True)
     reviews = db.relationship('Review', backref='user', lazy=True)
 
+    @staticmethod
+    def format_display_name(first_name, last_name, email):
+        """Full name if set, falling back to the email address."""
+        first = first_name or ""
+        last = last_name or ""
+        return (first + " " + last).strip() if (first or last) else email
+
+    @property
+    def display_name(self):
+        return self.format_display_name(self.first_name, self.last_name, self.email)
+
+    @classmethod
+    def find_by_email(cls, email):
+        return cls.query.filter(cls.email_normalized == normalize_email(email)).first()
+
     def set_password(self, password):
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password)
 
     def to_dict(self):
         return {
@@ -28,6 +55,12 @@ class User(db.Model):
             "first_name": self.first_name,
             "last_name": self.last_name,
             "is_admin": self.is_admin,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
+
+
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def _sync_email_normalized(mapper, connection, target):
+    target.email_normalized = normalize_email(target.email)
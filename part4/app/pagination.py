@@ -0,0 +1,51 @@
+import base64
+import binascii
+import json
+import math
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Types a sort key value may have in a cursor, for decode_cursor
+ID_KEY = (str,)
+RATING_KEY = (int, float)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Opaque cursor for keyset pagination from the sort key of the last row."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, key_types=(ID_KEY,)):
+    """Inverse of encode_cursor. The cursor must carry one value per entry
+    of ``key_types``, each of one of that entry's types, so a crafted
+    cursor never reaches the keyset query."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(key_types):
+        raise InvalidCursor("Invalid cursor")
+    for value, types in zip(values, key_types):
+        # bool is an int, and json.loads accepts NaN and Infinity
+        if (isinstance(value, bool) or not isinstance(value, types)
+                or (isinstance(value, float) and not math.isfinite(value))):
+            raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def parse_limit(value):
+    """Clamp the ?limit= argument to [1, MAX_LIMIT]."""
+    if value is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    return max(1, min(limit, MAX_LIMIT))
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when a hash or verify could not start within the queue timeout."""
+
+
+def _executor_class():
+    """Under gevent, patched threads are greenlets and a hash on one would
+    stall the event loop; gevent's executor runs the work on real threads."""
+    if 'gevent' in sys.modules:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+            return NativeThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so request threads only wait on a future while
+    the CPU-heavy work is capped at PASSWORD_HASH_WORKERS concurrent hashes.
+    At most PASSWORD_HASH_QUEUE_SIZE more may wait; anything beyond that, or
+    waiting longer than PASSWORD_HASH_TIMEOUT seconds, raises
+    PasswordHasherBusy so a login burst fails fast instead of pinning every
+    worker thread.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 2
+        self.queue_size = 8
+        self.timeout = 5.0
+        self._bcrypt = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import bcrypt
+        self._bcrypt = bcrypt
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 2
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.workers * 4)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        self.shutdown()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        # Created on first use so no threads exist before a pre-fork server forks
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = _executor_class()(
+                        max_workers=self.workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    def _run(self, fn, *args):
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            if future.cancel():
+                raise PasswordHasherBusy()
+            # Already running: the hash itself is bounded, wait for it
+            return future.result()
+
+    def hash(self, password):
+        return self._run(self._bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, pw_hash, password):
+        return self._run(self._bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True if ``pw_hash`` was made with a different work factor."""
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
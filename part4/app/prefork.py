@@ -0,0 +1,56 @@
+import os
+import resource
+import sys
+
+from sqlalchemy.engine import make_url
+
+from app.db_pool import pool_stats
+from app.extensions import db, password_hasher
+
+# DBAPI drivers whose I/O goes through Python sockets, which gevent makes
+# cooperative. C drivers (mysqlclient, sqlite3) hold the worker while they wait.
+COOPERATIVE_DRIVERS = {'pymysql'}
+# Blocking drivers a gevent worker still starts with: sqlite3 only waits on
+# local disk. Any other blocking driver stops the worker from booting.
+TOLERATED_BLOCKING_DRIVERS = {'pysqlite'}
+
+
+def reset_after_fork(app):
+    """Drop what a forked worker must not share with the parent process.
+
+    Pooled connections are sockets the parent and every sibling would
+    otherwise hold too; ``close=False`` forgets them without closing them
+    out from under the parent. The bcrypt pool's threads do not survive a
+    fork, so the executor is dropped and rebuilt on first use.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    password_hasher.shutdown()
+    pool_stats.reset()
+
+
+def cooperative_url(url):
+    """``url`` with a bare ``mysql://`` scheme, whose default driver is
+    mysqlclient, switched to PyMySQL. Any other URL is returned unchanged."""
+    parsed = make_url(url)
+    if parsed.drivername != 'mysql':
+        return url
+    return parsed.set(drivername='mysql+pymysql').render_as_string(hide_password=False)
+
+
+def blocking_drivers(app):
+    """Drivers of the app's engines that would block an event loop."""
+    with app.app_context():
+        return sorted({engine.dialect.driver for engine in db.engines.values()} - COOPERATIVE_DRIVERS)
+
+
+def rss_bytes():
+    """Resident set size of this process."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # No procfs: fall back to the peak RSS (kB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,88 @@
+import re
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app.extensions import db, response_cache
+
+# Read endpoints replayed by `flask check-query-plans`, with the tables each
+# one is allowed to read in full (unfiltered, unpaginated lists).
+PLAN_CHECKS = [
+    ('/api/v1/places/', ()),
+    ('/api/v1/places/?sort=rating', ()),
+    ('/api/v1/places/{place_id}', ()),
+    ('/api/v1/places/{place_id}/amenities', ()),
+    ('/api/v1/places/{place_id}/reviews/', ()),
+    ('/api/v1/places/{place_id}/reviews', ()),
+    ('/api/v1/places/search?location=a', ()),
+    ('/api/v1/places/search?location=abc', ()),
+    ('/api/v1/places/search?min_price=10&max_price=50', ()),
+    ('/api/v1/places/search?lat=40.7&lon=-74&radius_km=25', ()),
+    ('/api/v1/amenities/', ('amenity',)),
+    ('/api/v1/amenities/{amenity_id}', ()),
+    ('/api/v1/users/', ('users',)),
+    ('/api/v1/users/{user_id}', ()),
+]
+
+# "SCAN review" is a full table scan; "SCAN places USING INDEX ..." walks an
+# index in order (keyset pages) and is fine.
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def _sample_ids():
+    from app.models.amenity import Amenity
+    from app.models.place import Place
+    from app.models.user import User
+    return {
+        'place_id': db.session.query(Place.id).limit(1).scalar() or 'missing',
+        'amenity_id': db.session.query(Amenity.id).limit(1).scalar() or 'missing',
+        'user_id': db.session.query(User.id).limit(1).scalar() or 'missing',
+    }
+
+
+def _full_scans(connection, statement, parameters):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return {m.group(1) for m in (_SQLITE_FULL_SCAN.match(row[-1]) for row in rows) if m}
+    if dialect == 'mysql':
+        rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings()
+        return {row['table'] for row in rows if row['type'] == 'ALL'}
+    raise RuntimeError("Query plan checks support SQLite and MySQL, not %s" % dialect)
+
+
+def check_query_plans(app):
+    """Replay PLAN_CHECKS and return (path, table, statement) for every
+    query that reads a table in full where the endpoint should not."""
+    with app.app_context():
+        ids = _sample_ids()
+        token = create_access_token(identity=ids['user_id'], additional_claims={"is_admin": True})
+        engines = list(db.engines.values())
+    headers = {'Authorization': 'Bearer ' + token}
+    client = app.test_client()
+    problems = []
+    for template, allowed in PLAN_CHECKS:
+        path = template.format(**ids)
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((conn.engine, statement, parameters))
+
+        response_cache.clear()
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            client.get(path, headers=headers)
+        finally:
+            for engine in engines:
+                event.remove(engine, 'before_cursor_execute', capture)
+        seen = set()
+        for engine, statement, parameters in captured:
+            if statement in seen:
+                continue  # same statement in a loop, e.g. per-place reviews
+            seen.add(statement)
+            with engine.connect() as connection:
+                for table in _full_scans(connection, statement, parameters) - set(allowed):
+                    problems.append((path, table, statement))
+    return problems
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from flask import request, g, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+# Blueprints whose GETs may be answered from the replica
+READ_BLUEPRINTS = {'places', 'reviews', 'amenities', 'users', 'place_amenities', 'place_reviews'}
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of replica-routed requests to the
+    ``replica`` bind. Flushes and DML always go to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing
+                and not getattr(clause, 'is_dml', False)
+                and has_request_context() and g.get('db_use_replica')):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may go to the replica.
+
+    A caller who wrote within the read-your-writes window keeps reading from
+    the primary until the replica has had time to catch up. The window is
+    tracked per process: with several workers, size it to cover the
+    replication lag rather than relying on it for anything stronger.
+    """
+
+    def __init__(self, app=None):
+        self.window = 5.0
+        self._lock = threading.Lock()
+        self._recent_writers = {}
+        self._last_write = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.window = app.config.get('DB_REPLICA_READ_YOUR_WRITES_SECONDS', 5.0)
+        app.extensions['replica_router'] = self
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        app.before_request(self._route_request)
+        app.after_request(self._record_write)
+
+    @staticmethod
+    def _caller():
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+        return 'user:%s' % identity if identity else 'addr:%s' % request.remote_addr
+
+    def _route_request(self):
+        if request.method not in ('GET', 'HEAD') or request.blueprint not in READ_BLUEPRINTS:
+            return
+        now = time.monotonic()
+        with self._lock:
+            wrote_until = self._recent_writers.get(self._caller(), 0.0)
+            recent_write = now - self._last_write < self.window
+        g.db_use_replica = now >= wrote_until
+        # The replica may still predate a write that just invalidated the
+        # response cache; don't put what it returns back into the cache.
+        if g.db_use_replica and recent_write:
+            g.response_cacheable = False
+
+    def _record_write(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            now = time.monotonic()
+            caller = self._caller()
+            with self._lock:
+                self._last_write = now
+                self._recent_writers[caller] = now + self.window
+                if len(self._recent_writers) > 10000:
+                    self._recent_writers = {
+                        key: until for key, until in self._recent_writers.items() if until > now
+                    }
+        return response
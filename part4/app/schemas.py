@@ -11,3 +11,10 @@ class PlaceSchema(Schema):
 class ReviewSchema(Schema):
     text = fields.Str(required=True, validate=validate.Length(min=1))
     rating = fields.Int(required=True, validate=validate.Range(min=1, max=5))
+
+class ReviewBatchItemSchema(ReviewSchema):
+    place_id = fields.Str(required=True, validate=validate.Length(min=1))
+
+class AmenitySchema(Schema):
+    name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    description = fields.Str(allow_none=True)
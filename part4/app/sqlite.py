@@ -0,0 +1,41 @@
+from sqlalchemy import event
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer instead of failing with "database is locked"; NORMAL sync is
+# durable across application crashes in WAL mode (only an OS crash can lose
+# the last transactions); busy_timeout makes a second writer wait instead of
+# erroring.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute('PRAGMA %s = %s' % (name, value))
+        cursor.close()
+    return on_connect
+
+
+def init_sqlite(app, db):
+    """Install SQLITE_PRAGMAS on every SQLite engine of ``db``."""
+    pragmas = app.config.get('SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _apply_pragmas(pragmas))
+
+
+def optimize(connection, analyze=False):
+    """Refresh the query planner statistics and checkpoint the WAL."""
+    connection.exec_driver_sql('ANALYZE' if analyze else 'PRAGMA optimize')
+    return connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
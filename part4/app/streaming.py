@@ -0,0 +1,44 @@
+from flask import request, current_app, stream_with_context
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def wants_stream():
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_query(query, serialize, key=None, extra=None):
+    """Stream ``query`` as a JSON array, or as ``{key: [...], **extra}``.
+
+    Rows are fetched ``STREAM_CHUNK_SIZE`` at a time with ``yield_per`` and
+    written out as they are serialized, so memory stays bounded by the chunk
+    size instead of the table size. ``serialize`` may return None to skip a
+    row. The status is sent before the first row, so errors past that point
+    end the body early instead of producing an error response.
+    """
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    dumps = current_app.json.dumps
+    if key is None:
+        prefix, suffix = '[', ']'
+    else:
+        prefix = '{%s: [' % dumps(key)
+        suffix = ']' + ''.join(', %s: %s' % (dumps(k), dumps(v)) for k, v in (extra or {}).items()) + '}'
+
+    def generate():
+        yield prefix
+        separator = ''
+        buffer = []
+        for row in query.yield_per(chunk_size):
+            item = serialize(row)
+            if item is None:
+                continue
+            buffer.append(dumps(item))
+            if len(buffer) >= chunk_size:
+                yield separator + ','.join(buffer)
+                separator = ','
+                buffer = []
+        if buffer:
+            yield separator + ','.join(buffer)
+        yield suffix
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,156 @@
+"""Helpers shared by the benchmarks. Run them from part4/ as modules, e.g.
+``python -m bench.compression``."""
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from app import config as app_config, create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User
+
+ADJECTIVES = ['Cozy', 'Sunny', 'Quiet', 'Modern']
+KINDS = ['loft', 'flat', 'cabin', 'villa']
+WORDS = ['bright', 'view', 'garden', 'close', 'metro', 'pool', 'wifi', 'quiet']
+CITIES = ['Paris', 'Lyon', 'Nice', 'Lille']
+
+
+def default_location(rng, i):
+    return '%s %d' % (rng.choice(CITIES), i)
+
+
+def seed_places(app, count=1000, seed=1, location=default_location, batch_size=20000):
+    """Create the tables and ``count`` places with realistic text fields,
+    owned by one user, inserted ``batch_size`` at a time. ``location(rng,
+    i)`` makes each place's location."""
+    rng = random.Random(seed)
+    with app.app_context():
+        db.create_all()
+        owner = User(first_name='Bench', last_name='Owner', email='owner@bench.invalid', password='x')
+        db.session.add(owner)
+        db.session.commit()
+        for first in range(0, count, batch_size):
+            Place.bulk_insert([
+                dict(
+                    name='%s %s %d' % (rng.choice(ADJECTIVES), rng.choice(KINDS), i),
+                    description='Place %d: %s' % (i, ' '.join(rng.choice(WORDS) for _ in range(12))),
+                    price=round(rng.uniform(20, 300), 2),
+                    location=location(rng, i),
+                    latitude=rng.uniform(40, 41),
+                    longitude=rng.uniform(-74, -73),
+                    owner_id=owner.id,
+                )
+                for i in range(first, min(first + batch_size, count))
+            ])
+            db.session.commit()
+
+
+PART4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def file_app(database_url, **settings):
+    """A TestingConfig app on ``database_url`` instead of in-memory SQLite,
+    with ``settings`` overriding other config values."""
+    class BenchConfig(app_config.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+    for name, value in settings.items():
+        setattr(BenchConfig, name, value)
+    app_config.BenchConfig = BenchConfig
+    return create_app('BenchConfig')
+
+
+class Server:
+    """A gunicorn process started from part4/gunicorn.conf.py."""
+
+    def __init__(self, process, log, port):
+        self.process = process
+        self.log = log
+        self.port = port
+
+    def workers(self):
+        with open('/proc/%d/task/%d/children' % (self.process.pid, self.process.pid)) as f:
+            return [int(pid) for pid in f.read().split()]
+
+    def booted_workers(self):
+        self.log.seek(0)
+        return self.log.read().count(b'Booting worker')
+
+
+@contextlib.contextmanager
+def gunicorn(database_url, port=8765, app='wsgi:app', pythonpath=None, **settings):
+    """Run gunicorn on ``database_url`` with the given gunicorn.conf.py
+    environment settings (GUNICORN_THREADS=4, ...) until the block exits."""
+    env = dict(os.environ, DATABASE_URL=database_url, GUNICORN_BIND='127.0.0.1:%d' % port,
+               GUNICORN_ACCESS_LOG='/dev/null', PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp())
+    env.update((name, str(value)) for name, value in settings.items())
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--backlog', '4096']
+    if pythonpath:
+        command += ['--pythonpath', pythonpath]
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(command + [app], cwd=PART4, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                log.seek(0)
+                raise RuntimeError("gunicorn exited:\n" + log.read().decode(errors='replace'))
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+        yield Server(process, log, port)
+    finally:
+        process.terminate()
+        process.wait(60)
+        log.close()
+
+
+def load(port, path, total, concurrency):
+    """GET ``path`` ``total`` times from ``concurrency`` clients, one
+    connection per request. Returns (sorted latencies in s, errors, elapsed s)."""
+    latencies, errors = [], []
+    request = ('GET %s HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n' % path).encode()
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 120)
+            writer.close()
+        except Exception as e:
+            errors.append(type(e).__name__)
+            return
+        if data.startswith(b'HTTP/1.1 200'):
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(data[:12].decode(errors='replace') or 'empty response')
+
+    async def client(remaining):
+        while remaining:
+            remaining.pop()
+            await one()
+
+    async def run():
+        remaining = list(range(total))
+        await asyncio.gather(*[client(remaining) for _ in range(concurrency)])
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return sorted(latencies), errors, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
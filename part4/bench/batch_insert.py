@@ -0,0 +1,52 @@
+"""One /batch request versus one POST per item.
+
+    python -m bench.batch_insert
+
+Creates the same places through the test client, first as a single
+POST /api/v1/places/batch, then as one POST /api/v1/places/ each, on
+in-memory SQLite.
+"""
+import random
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.identity import identity_claims
+from app.models.user import User
+from bench._common import ADJECTIVES, CITIES, KINDS
+
+
+def main(count=500, seed=1):
+    app = create_app('TestingConfig')
+    rng = random.Random(seed)
+    with app.app_context():
+        db.create_all()
+        owner = User(first_name='Bench', last_name='Owner', email='owner@bench.invalid', password='x')
+        db.session.add(owner)
+        db.session.commit()
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(owner.id), additional_claims=identity_claims(owner))}
+    items = [
+        dict(name='%s %s %d' % (rng.choice(ADJECTIVES), rng.choice(KINDS), i),
+             price=round(rng.uniform(20, 300), 2),
+             location='%s %d' % (rng.choice(CITIES), i),
+             latitude=rng.uniform(40, 41), longitude=rng.uniform(-74, -73))
+        for i in range(count)
+    ]
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post('/api/v1/places/batch', json=items, headers=headers)
+    batch = time.perf_counter() - start
+    assert response.status_code == 201, response.get_json()
+    start = time.perf_counter()
+    for item in items:
+        assert client.post('/api/v1/places/', json=item, headers=headers).status_code == 201
+    single = time.perf_counter() - start
+    print('%d places: batch %.0f ms, single POSTs %.0f ms (%.1fx)' % (
+        count, batch * 1e3, single * 1e3, single / batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Response sizes and compression CPU per encoding and level, in process.
+
+    python -m bench.compression [--places 1000]
+
+For the places list (20 and 100 per page) and the streamed export: the
+identity size, then size and time per response for gzip and brotli at
+several levels, then full requests per Accept-Encoding. For the static
+assets: the precompressed sizes against gzip on the fly, and the cost of
+a cold and a warm asset build.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from app import create_app
+from app.assets import SUFFIXES, build_assets
+from app.compression import ENCODERS, available_encodings
+from bench._common import seed_places
+
+PATHS = ['/api/v1/places/?limit=20', '/api/v1/places/?limit=100', '/api/v1/places/?stream=1']
+LEVELS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 11)]
+
+
+def per_call_us(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--places', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app('TestingConfig')
+    seed_places(app, args.places)
+    client = app.test_client()
+    encodings = available_encodings()
+
+    for path in PATHS:
+        raw = client.get(path).get_data()
+        print('%s  identity %d B' % (path, len(raw)))
+        for encoding, level in LEVELS:
+            if encoding not in encodings:
+                continue
+            compress = ENCODERS[encoding][0]
+            size = len(compress(raw, level))
+            us = per_call_us(lambda: compress(raw, level), 5 if level == 11 else 20)
+            print('  %-4s %-2d %8d B (%4.1f%%) %9.0f us' % (encoding, level, size, 100 * size / len(raw), us))
+        for accept in (None,) + encodings:
+            headers = {'Accept-Encoding': accept} if accept else {}
+            size = len(client.get(path, headers=headers).get_data())
+            us = per_call_us(lambda: client.get(path, headers=headers).get_data(), 30)
+            print('  request %-8s %9.0f us %8d B' % (accept or 'identity', us, size))
+
+    store = app.extensions['assets']
+    build_dir = tempfile.mkdtemp(prefix='hbnb-assets-')
+    try:
+        start = time.perf_counter()
+        manifest = build_assets(store.source_dir, build_dir, store.pages())
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        build_assets(store.source_dir, build_dir, store.pages())
+        warm = time.perf_counter() - start
+        print('static assets')
+        for name, built in sorted(manifest['assets'].items()):
+            with open(os.path.join(store.source_dir, name), 'rb') as f:
+                raw = f.read()
+            if not manifest['encodings'][built]:
+                print('  %-12s %6d B  served as is' % (name, len(raw)))
+                continue
+            sizes = ', '.join(
+                '%s %d B' % (encoding, os.path.getsize(os.path.join(build_dir, built + SUFFIXES[encoding])))
+                for encoding in manifest['encodings'][built])
+            on_the_fly = per_call_us(lambda: ENCODERS['gzip'][0](raw, 6), 50)
+            print('  %-12s %6d B  precompressed: %s  (gzip-6 per request would cost %.0f us)'
+                  % (name, len(raw), sizes, on_the_fly))
+        print('asset build: cold %.0f ms, warm %.0f ms' % (cold * 1e3, warm * 1e3))
+    finally:
+        shutil.rmtree(build_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""How long bcrypt hashing stalls a gevent loop (app/passwords.py).
+
+    python -m bench.gevent_hash_stall
+
+Hashes four passwords at 12 rounds on greenlets while a ticker greenlet
+sleeps 10 ms at a time, and reports the longest gap between its ticks.
+With the native-thread executor the loop keeps running during hashes.
+"""
+# Patch before anything imports threading, as gunicorn.conf.py does
+from gevent import monkey
+
+monkey.patch_all()
+
+import time
+
+import gevent
+
+from app.passwords import PasswordHasher
+
+
+class _App:
+    config = {'BCRYPT_LOG_ROUNDS': 12, 'PASSWORD_HASH_WORKERS': 2,
+              'PASSWORD_HASH_QUEUE_SIZE': 8, 'PASSWORD_HASH_TIMEOUT': 30}
+    extensions = {}
+
+
+def main():
+    hasher = PasswordHasher()
+    hasher.init_app(_App())
+    gaps = []
+
+    def ticker():
+        last = time.perf_counter()
+        while True:
+            gevent.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick = gevent.spawn(ticker)
+    start = time.perf_counter()
+    hashes = [gevent.spawn(hasher.hash, 'password %d' % i) for i in range(4)]
+    gevent.joinall(hashes, raise_error=True)
+    elapsed = time.perf_counter() - start
+    tick.kill()
+    print('executor %s: 4 hashes in %.2f s, longest loop stall %.0f ms'
+          % (type(hasher._get_executor()).__module__, elapsed, max(gaps, default=elapsed) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Throughput and latency of sync, gthread and gevent workers when
+requests mostly wait on the database.
+
+    python -m bench.gevent_load [--clients 100 1000] [--requests 3000] [--servers sync gthread gevent]
+
+Serves bench/slow_db.py (50 ms of cooperative wait per query) on a seeded
+SQLite file with the response cache off, and loads GET
+/api/v1/places/?limit=20 (2 queries) from each number of concurrent
+clients. Each mode's pool is sized as gunicorn.conf.py advises, one
+connection per thread and 100 for the gevent worker; with the default
+10 + 5, queries wait for a connection and fail after DB_POOL_TIMEOUT.
+Run the load generator on other cores than the server if you can; on
+one CPU they compete.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from bench._common import file_app, gunicorn, load, percentile, seed_places
+
+PATH = '/api/v1/places/?limit=20'
+MODES = [
+    ('sync 4 workers', dict(WEB_CONCURRENCY=4)),
+    ('gthread 4x25', dict(WEB_CONCURRENCY=4, GUNICORN_THREADS=25, DB_POOL_SIZE=25)),
+    ('gevent 1 worker', dict(WEB_CONCURRENCY=1, GUNICORN_WORKER_CLASS='gevent', DB_POOL_SIZE=100)),
+]
+MODES_BY_NAME = {label.split()[0]: (label, settings) for label, settings in MODES}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--servers', nargs='+', choices=sorted(MODES_BY_NAME), default=[m[0].split()[0] for m in MODES])
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='hbnb-bench-')
+    database_url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    try:
+        seed_places(file_app(database_url))
+        print('%-8s %-18s %6s %7s %9s %9s' % ('clients', 'server', 'errors', 'req/s', 'p50 ms', 'p99 ms'))
+        for clients in args.clients:
+            for label, settings in (MODES_BY_NAME[name] for name in args.servers):
+                with gunicorn(database_url, app='bench.slow_db:app', RESPONSE_CACHE_BACKEND='null',
+                              GUNICORN_MAX_REQUESTS=0, GUNICORN_TIMEOUT=120, **settings) as server:
+                    latencies, errors, elapsed = load(server.port, PATH, args.requests, clients)
+                print('%-8d %-18s %6d %7.0f %9.0f %9.0f %s' % (
+                    clients, label, len(errors), len(latencies) / elapsed,
+                    percentile(latencies, .5) * 1000, percentile(latencies, .99) * 1000,
+                    ' '.join(sorted(set(errors)))))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Response serialization with Flask's default JSON provider, the stdlib
+IsoJSONProvider and OrjsonProvider (app/json_provider.py).
+
+    python -m bench.json_providers
+
+Builds two payloads from seeded places: a list of 100 places and one
+place with 50 reviews, in the shapes Place.to_dict returns. Times
+app.json.response on each. For Flask's default provider the datetimes are
+converted with isoformat() first, as the models did before, and that
+conversion is counted.
+"""
+import os
+import tempfile
+import timeit
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.extensions import db
+from app.json_provider import orjson
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from bench._common import file_app, seed_places
+
+
+def isoformat_dates(obj):
+    if isinstance(obj, dict):
+        return {key: isoformat_dates(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [isoformat_dates(value) for value in obj]
+    return obj.isoformat() if isinstance(obj, datetime) else obj
+
+
+def unchanged(obj):
+    return obj
+
+
+def payloads(app):
+    with app.app_context():
+        places = Place.query.order_by(Place.id).limit(100).all()
+        detail = places[0]
+        now = datetime.utcnow()
+        for i in range(50):
+            user = User(first_name='Reviewer', last_name=str(i), email='reviewer%d@bench.invalid' % i, password='x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Review(text='Lovely stay ' * 15, rating=1 + i % 5, user_id=user.id, place_id=detail.id,
+                                  created_at=now, updated_at=now))
+        db.session.commit()
+        return ({'places': [place.to_dict(include_reviews=False) for place in places], 'next': None},
+                detail.to_dict())
+
+
+def main(number=2000):
+    providers = [('flask default', None), ('stdlib iso', 'stdlib')]
+    if orjson is not None:
+        providers.append(('orjson', 'orjson'))
+    with tempfile.TemporaryDirectory() as directory:
+        app = file_app('sqlite:///%s' % os.path.join(directory, 'json.db'))
+        seed_places(app, 100)
+        listing, detail = payloads(app)
+    for name, provider in providers:
+        app = file_app('sqlite://', JSON_PROVIDER=provider or 'stdlib')
+        convert = unchanged
+        if provider is None:
+            app.json = DefaultJSONProvider(app)
+            convert = isoformat_dates
+        with app.app_context():
+            times = [
+                min(timeit.repeat(lambda: app.json.response(convert(payload)).get_data(), number=number, repeat=3))
+                / number * 1e6
+                for payload in (listing, detail)
+            ]
+        print('%-14s places list (100) %6.0f us   place detail (50 reviews) %6.0f us' % (name, *times))
+
+
+if __name__ == '__main__':
+    main()
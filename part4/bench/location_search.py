@@ -0,0 +1,87 @@
+"""Location search with and without the trigram index.
+
+    python -m bench.location_search [--sizes 100000 1000000] [--vocabularies words syllables]
+
+Seeds in-memory SQLite with places whose locations are two words, from
+one of two vocabularies:
+- words: 20,000 random 4-9 letter words. Trigrams are selective, as in
+  real place names.
+- syllables: 15 syllables strung together. Every trigram is common, so
+  the trigram lookups read long posting lists; the index's worst case.
+Then for a few terms it times, per call:
+- ilike: the original leading-wildcard ILIKE filter, a full scan of places
+- trigram: the indexed query search_places now runs (candidates from the
+  trigram table, substring confirmed on location_normalized)
+- endpoint: GET /api/v1/places/search?location=<term>, end to end
+Both queries count their matches, which must agree.
+"""
+import argparse
+import random
+import string
+import time
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.place_location_trigram import location_candidates, normalize_location
+from bench._common import seed_places
+
+SYLLABLES = ['ba', 'ro', 'ki', 'lan', 'mur', 'ton', 'vil', 'sa', 'den', 'or', 'ex', 'qua', 'zel', 'pri', 'ham']
+
+
+def syllable_vocabulary():
+    def location(rng, i):
+        def word(syllables):
+            return ''.join(rng.choice(SYLLABLES) for _ in range(syllables)).title()
+        return '%s %s' % (word(rng.randint(2, 4)), word(3))
+    return location, ['zelpri', 'kimur', 'quaex', 'ham', 'ab']
+
+
+def word_vocabulary():
+    rng = random.Random(2)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+             for _ in range(20000)]
+
+    def location(rng, i):
+        return '%s %s' % (rng.choice(words).title(), rng.choice(words).title())
+    return location, [words[5][1:5], words[7], words[9][:3], 'ab']
+
+
+VOCABULARIES = {'words': word_vocabulary, 'syllables': syllable_vocabulary}
+
+
+def per_call_ms(fn, n=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        result = fn()
+    return result, (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--vocabularies', nargs='+', choices=sorted(VOCABULARIES), default=['words', 'syllables'])
+    args = parser.parse_args()
+    for vocabulary, size in ((v, n) for v in args.vocabularies for n in args.sizes):
+        location, terms = VOCABULARIES[vocabulary]()
+        app = create_app('TestingConfig')
+        seed_places(app, size, location=location)
+        client = app.test_client()
+        with app.app_context():
+            for term in terms:
+                normalized = normalize_location(term)
+                ilike = db.session.query(Place.id).filter(Place.location.ilike('%' + term + '%'))
+                trigram = db.session.query(Place.id).filter(Place.id.in_(location_candidates(term)))
+                if len(term) >= 3:
+                    trigram = trigram.filter(Place.location_normalized.contains(normalized, autoescape=True))
+                old_count, old_ms = per_call_ms(ilike.count)
+                new_count, new_ms = per_call_ms(trigram.count)
+                _, endpoint_ms = per_call_ms(lambda: client.get('/api/v1/places/search', query_string={'location': term}))
+                print('%-9s %8d places %-11r %6d matches  ilike %7.1f ms  trigram %6.1f ms  endpoint %7.1f ms%s'
+                      % (vocabulary, size, term, new_count, old_ms, new_ms, endpoint_ms,
+                         '' if old_count == new_count else '  (ilike found %d)' % old_count), flush=True)
+
+
+if __name__ == '__main__':
+    main()
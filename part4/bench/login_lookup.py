@@ -0,0 +1,59 @@
+"""Email lookups and login with many users (User.email_normalized).
+
+    python -m bench.login_lookup [--users 1000000]
+
+Seeds a file SQLite database with --users users whose stored emails
+have mixed case, then times:
+- lower: the former lookup, func.lower(User.email) == email (full scan)
+- normalized: User.find_by_email (unique index seek on email_normalized)
+- login: POST /api/v1/login/ end to end, with the test config's bcrypt cost
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.user import User, normalize_email
+from bench._common import file_app
+
+
+def per_call_ms(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        app = file_app('sqlite:///%s' % os.path.join(directory, 'users.db'))
+        with app.app_context():
+            db.create_all()
+            template = User(first_name='Bench', last_name='User', email='template@bench.invalid')
+            template.set_password('secret')
+            for first in range(0, args.users, 50000):
+                db.session.execute(db.insert(User), [
+                    dict(first_name='Bench', last_name='User', password=template.password,
+                         email='User%d@Example.com' % i, email_normalized=normalize_email('User%d@Example.com' % i))
+                    for i in range(first, min(first + 50000, args.users))
+                ])
+                db.session.commit()
+            email = 'user%d@example.com' % (args.users - 1)
+            lower = per_call_ms(lambda: User.query.filter(func.lower(User.email) == email).first(), 5)
+            normalized = per_call_ms(lambda: User.find_by_email(' User%d@example.COM' % (args.users - 1)), 200)
+        client = app.test_client()
+        assert client.post('/api/v1/login/', json={'email': email, 'password': 'secret'}).status_code == 200
+        login = per_call_ms(lambda: client.post('/api/v1/login/', json={'email': email, 'password': 'secret'}), 20)
+    print('%d users: lookup lower %.2f ms, normalized %.3f ms; login %.2f ms' % (
+        args.users, lower, normalized, login))
+
+
+if __name__ == '__main__':
+    main()
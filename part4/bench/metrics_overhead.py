@@ -0,0 +1,34 @@
+"""Per-request cost of the request metrics hooks (app/metrics.py).
+
+    python -m bench.metrics_overhead
+    PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) python -m bench.metrics_overhead
+
+Runs the three hooks back to back on one matched route, as a request with
+a 500 byte response would.
+"""
+import os
+import time
+
+from flask import request
+
+from app import create_app
+
+
+def main(n=100000):
+    app = create_app('TestingConfig')
+    metrics = app.extensions['metrics']
+    with app.test_request_context('/api/v1/places/abc', method='GET'):
+        request.url_rule = app.create_url_adapter(request).match(return_rule=True)[0]
+        response = app.response_class(b'x' * 500, mimetype='application/json')
+        for _ in range(1000):
+            metrics._start(); metrics._record(response); metrics._finish(None)
+        start = time.perf_counter()
+        for _ in range(n):
+            metrics._start(); metrics._record(response); metrics._finish(None)
+        elapsed = time.perf_counter() - start
+    mode = 'multiprocess' if os.environ.get('PROMETHEUS_MULTIPROC_DIR') else 'single-process'
+    print('%s: %.2f us per request' % (mode, elapsed / n * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Memory, recycling and fork safety of the gunicorn setup (gunicorn.conf.py).
+
+    python -m bench.prefork [--workers 4]
+
+memory: per-worker private dirty memory and PSS after 400 requests, with
+and without preloading the app in the master (Linux, reads smaps_rollup).
+recycling: errors seen by 16 clients while workers restart every ~50
+requests, for sync and gthread workers.
+fork: whether a child forked from a process with a warm connection pool
+and bcrypt executor can query and hash, with and without
+app.prefork.reset_after_fork.
+"""
+import argparse
+import os
+import shutil
+import signal
+import tempfile
+
+from sqlalchemy import text
+
+from app.extensions import db, password_hasher
+from app.prefork import reset_after_fork
+from bench._common import file_app, gunicorn, load, seed_places
+
+PATH = '/api/v1/places/?limit=20'
+
+
+def smaps(pid):
+    values = {}
+    with open('/proc/%d/smaps_rollup' % pid) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return values
+
+
+def memory(database_url, workers):
+    for preload in ('1', '0'):
+        with gunicorn(database_url, WEB_CONCURRENCY=workers, GUNICORN_PRELOAD=preload,
+                      GUNICORN_MAX_REQUESTS=0) as server:
+            load(server.port, PATH, 400, 8)
+            master = smaps(server.process.pid)
+            per_worker = [smaps(pid) for pid in server.workers()]
+        private = sum(w['Private_Dirty'] for w in per_worker) / len(per_worker)
+        pss = sum(w['Pss'] for w in per_worker) / len(per_worker)
+        total = master['Pss'] + sum(w['Pss'] for w in per_worker)
+        print('preload=%s: per worker %.0f MiB private dirty, %.0f MiB PSS; total PSS %.0f MiB'
+              % (preload, private, pss, total))
+
+
+def recycling(database_url):
+    for threads in (1, 4):
+        with gunicorn(database_url, WEB_CONCURRENCY=2, GUNICORN_THREADS=threads,
+                      GUNICORN_MAX_REQUESTS=50, GUNICORN_MAX_REQUESTS_JITTER=10) as server:
+            latencies, errors, _ = load(server.port, PATH, 600, 16)
+            booted = server.booted_workers()
+        print('%s: %d ok, %d errors%s, %d workers booted'
+              % ('gthread x%d' % threads if threads > 1 else 'sync', len(latencies), len(errors),
+                 ' %s' % sorted(set(errors)) if errors else '', booted))
+
+
+def fork_safety(database_url):
+    app = file_app(database_url)
+    with app.app_context():
+        db.session.execute(text('select 1'))
+        db.session.remove()
+    password_hasher.hash('warm up')  # the parent now has live bcrypt threads
+    for reset in (False, True):
+        pid = os.fork()
+        if pid == 0:
+            signal.alarm(5)
+            if reset:
+                reset_after_fork(app)
+            with app.app_context():
+                db.session.execute(text('select 1'))
+            password_hasher.hash('in the child')
+            os._exit(0)
+        _, status = os.waitpid(pid, 0)
+        outcome = 'hung (killed after 5 s)' if os.WIFSIGNALED(status) else 'ok' if status == 0 else 'failed'
+        print('fork with reset_after_fork=%s: %s' % (reset, outcome))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='hbnb-bench-')
+    database_url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    try:
+        seed_places(file_app(database_url))
+        memory(database_url, args.workers)
+        recycling(database_url)
+        fork_safety(database_url)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
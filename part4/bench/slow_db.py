@@ -0,0 +1,24 @@
+"""wsgi.py with DB_LATENCY_MS (default 50) of wait added to every query.
+
+The wait is a time.sleep, which gevent's monkey patching makes
+cooperative, standing in for a database round trip. For
+bench.gevent_load only.
+"""
+import os
+import time
+
+from sqlalchemy import event
+
+from app.extensions import db
+from wsgi import app
+
+DELAY = float(os.environ.get('DB_LATENCY_MS', 50)) / 1000
+
+
+def _wait(*args):
+    time.sleep(DELAY)
+
+
+with app.app_context():
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', _wait)
@@ -0,0 +1,93 @@
+"""Mixed reads and writes on a file SQLite database, with and without
+SQLITE_PRAGMAS (app/sqlite.py).
+
+    python -m bench.sqlite_wal [--threads 8] [--processes 0] [--seconds 5]
+
+For each mode, seeds a fresh file database with 2000 places, then runs
+test clients for a fixed time, each doing 70% GET --read-path and 30%
+POST /api/v1/places/. With --processes N the clients are N forked
+processes instead of threads, so writers also contend across connections
+of different processes. The response cache is off in both modes.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.identity import identity_claims
+from app.models.user import User
+from bench._common import file_app, seed_places
+
+
+def client_loop(app, headers, read_path, seconds, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    stop = time.monotonic() + seconds
+    while time.monotonic() < stop:
+        if rng.random() < 0.3:
+            kind = 'writes'
+            response = client.post('/api/v1/places/', json={'name': 'New', 'price': 1, 'location': 'Somewhere'},
+                                   headers=headers)
+        else:
+            kind = 'reads'
+            response = client.get(read_path)
+        counts['errors' if response.status_code >= 500 else kind] += 1
+    return counts
+
+
+def run(mode, args, path):
+    app = file_app('sqlite:///%s' % path, **({} if mode == 'wal' else {'SQLITE_PRAGMAS': {}}))
+    seed_places(app, 2000)
+    with app.app_context():
+        owner = User.query.filter_by(email='owner@bench.invalid').one()
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(owner.id), additional_claims=identity_claims(owner))}
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        db.engine.dispose()
+    results = []
+    if args.processes:
+        queue = multiprocessing.Queue()
+
+        def child(seed):
+            queue.put(client_loop(app, headers, args.read_path, args.seconds, seed))
+        processes = [multiprocessing.Process(target=child, args=(i,)) for i in range(args.processes)]
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    else:
+        def worker(seed):
+            results.append(client_loop(app, headers, args.read_path, args.seconds, seed))
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    total = {key: sum(r[key] for r in results) for key in results[0]}
+    print('%-4s (journal_mode=%s): %4.0f reads/s + %4.0f writes/s = %4.0f ops/s, %d errors' % (
+        mode, journal_mode, total['reads'] / args.seconds, total['writes'] / args.seconds,
+        (total['reads'] + total['writes']) / args.seconds, total['errors']))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=0)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--read-path', default='/api/v1/places/?limit=20')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('off', 'wal'):
+            run(mode, args, os.path.join(directory, mode + '.db'))
+
+
+if __name__ == '__main__':
+    main()
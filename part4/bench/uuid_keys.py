@@ -0,0 +1,71 @@
+"""Insert rate and index size with uuid4 versus uuid7 (app.ids) keys.
+
+    python -m bench.uuid_keys [--rows 1000000]
+
+Inserts --rows rows into a review-shaped WITHOUT ROWID table (id primary
+key, indexed place_id) on a file SQLite database in 10k-row transactions,
+with keys stored as 36-character text (what the models use) and as 16-byte
+blobs. Reports the overall rate, the rate over the last 100k rows, and the
+size of the primary key and place_id B-trees (dbstat).
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from app.ids import uuid7
+
+BATCH = 10000
+LAYOUTS = [
+    ('text uuid4', uuid.uuid4, False),
+    ('text uuid7', uuid7, False),
+    ('binary uuid4', uuid.uuid4, True),
+    ('binary uuid7', uuid7, True),
+]
+
+
+def run(path, rows, make_id, binary, places):
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    key_type = 'BLOB' if binary else 'VARCHAR(36)'
+    connection.execute('CREATE TABLE review (id %s PRIMARY KEY, place_id %s NOT NULL, rating INTEGER)'
+                       ' WITHOUT ROWID' % (key_type, key_type))
+    connection.execute('CREATE INDEX ix_review_place_id ON review (place_id)')
+    convert = (lambda value: value.bytes) if binary else str
+    place_keys = [convert(place) for place in places]
+    batches = rows // BATCH
+    tail_batches = min(batches, 100000 // BATCH)
+    start = time.perf_counter()
+    for batch in range(batches):
+        if batch == batches - tail_batches:
+            tail_start = time.perf_counter()
+        connection.executemany('INSERT INTO review VALUES (?, ?, 3)', [
+            (convert(make_id()), place_keys[i % len(place_keys)]) for i in range(BATCH)
+        ])
+        connection.commit()
+    end = time.perf_counter()
+    connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    sizes = dict(connection.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'))
+    connection.close()
+    return (batches * BATCH / (end - start), tail_batches * BATCH, tail_batches * BATCH / (end - tail_start),
+            sizes['review'], sizes['ix_review_place_id'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    places = [uuid.uuid4() for _ in range(1000)]
+    for name, make_id, binary in LAYOUTS:
+        with tempfile.TemporaryDirectory() as directory:
+            overall, tail_rows, tail, primary, index = run(
+                os.path.join(directory, 'keys.db'), args.rows, make_id, binary, places)
+        print('%-13s %6.0f rows/s, last %dk %6.0f rows/s; primary key %4.0f MB, place_id index %4.0f MB' % (
+            name, overall, tail_rows // 1000, tail, primary / 1e6, index / 1e6), flush=True)
+
+
+if __name__ == '__main__':
+    main()
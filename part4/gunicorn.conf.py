@@ -0,0 +1,107 @@
+"""Gunicorn settings for wsgi.py; every value can be set from the environment.
+
+The app is imported once in the master and forked into the workers, so
+its code and read-only state are shared copy-on-write. Size the database
+pool per worker: DB_POOL_SIZE should cover GUNICORN_THREADS, and
+(DB_POOL_SIZE + DB_MAX_OVERFLOW) * WEB_CONCURRENCY must stay below the
+server's max_connections. PASSWORD_HASH_WORKERS is per worker as well.
+
+GUNICORN_WORKER_CLASS=gevent runs each worker as an event loop holding up
+to GUNICORN_WORKER_CONNECTIONS requests at once, for when requests mostly
+wait on the database. The views stay synchronous; gevent makes their
+socket waits cooperative. That needs a pure-Python driver: a bare
+mysql:// DATABASE_URL or DATABASE_REPLICA_URL, which would use
+mysqlclient, is switched to mysql+pymysql://. Workers refuse to boot on
+any other driver that would block the whole loop (e.g. an explicit
+mysql+mysqldb://), so the server fails at startup instead of stalling
+under load. sqlite3 blocks too but is allowed, with a warning, for local
+runs. Raise DB_POOL_SIZE to the number of queries that should be in
+flight per worker.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Above 1, each worker serves that many requests on threads (gthread). Note
+# that a recycling gthread worker resets connections it had accepted but
+# not yet read; sync workers hand them back to the shared listen socket.
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle a worker after this many requests (0 disables); the jitter keeps
+# the workers from all restarting at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 500))
+# ... or once its resident memory passes this many MiB (0 disables). RSS
+# includes the pages shared with the master; keep this well above a fresh
+# worker's (about 65 MiB).
+max_worker_rss = int(os.environ.get('GUNICORN_MAX_WORKER_RSS_MB', 512)) * 1024 * 1024
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+# With METRICS_ENABLED=1, each worker writes its metrics to files here and
+# /metrics sums them (app/metrics.py). Must be set before the app imports
+# prometheus_client. Only create a directory when none is configured.
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='hbnb-metrics-')
+
+if worker_class == 'gevent':
+    # Patch before the preloaded app creates its locks, pools and sockets
+    from gevent import monkey
+    monkey.patch_all()
+    # Before the app reads them, so its engines use PyMySQL
+    from app.prefork import cooperative_url
+    for name in ('DATABASE_URL', 'DATABASE_REPLICA_URL'):
+        if os.environ.get(name):
+            os.environ[name] = cooperative_url(os.environ[name])
+
+
+def _clear_metrics():
+    for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        os.remove(path)
+
+
+def on_starting(server):
+    # Counters left by a previous run would be summed into this one
+    _clear_metrics()
+
+
+def on_exit(server):
+    _clear_metrics()
+
+
+def post_fork(server, worker):
+    from app.prefork import reset_after_fork, blocking_drivers, TOLERATED_BLOCKING_DRIVERS
+    app = worker.app.wsgi()
+    reset_after_fork(app)
+    if worker_class == 'gevent':
+        blocking = blocking_drivers(app)
+        refused = [driver for driver in blocking if driver not in TOLERATED_BLOCKING_DRIVERS]
+        if refused:
+            # A worker that fails to boot halts the arbiter
+            raise RuntimeError("Database driver %s would block the gevent loop; use "
+                               "mysql+pymysql:// URLs" % ', '.join(refused))
+        for driver in blocking:
+            worker.log.warning("Database driver %s blocks the gevent loop during queries", driver)
+
+
+def post_request(worker, req, environ, resp):
+    from app.prefork import rss_bytes
+    if max_worker_rss and rss_bytes() > max_worker_rss:
+        # Finish in-flight requests, then exit; the arbiter starts a fresh worker
+        worker.log.info("Worker %s over %d MiB RSS, recycling", worker.pid, max_worker_rss >> 20)
+        worker.alive = False
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,43 @@
+"""Secondary indexes on foreign keys and filter columns
+
+Revision ID: 3c9a41d7e2b8
+Revises: 70aa2af013ed
+Create Date: 2026-10-18 18:02:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a41d7e2b8'
+down_revision = '70aa2af013ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # review.user_id is already the leading column of unique_user_place_review,
+    # and location search goes through place_location_trigram, so neither
+    # gets an index of its own.
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.create_index('ix_review_place_id_created_at', ['place_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_places_owner_id'), ['owner_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_places_price'), ['price'], unique=False)
+
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_place_amenity_amenity_id'), ['amenity_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_place_amenity_amenity_id'))
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_places_price'))
+        batch_op.drop_index(batch_op.f('ix_places_owner_id'))
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_place_id_created_at')
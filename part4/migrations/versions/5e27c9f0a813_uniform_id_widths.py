@@ -0,0 +1,46 @@
+"""Uniform 36-character id columns
+
+Revision ID: 5e27c9f0a813
+Revises: b81f06c2d4a9
+Create Date: 2026-10-18 19:05:52.180346
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e27c9f0a813'
+down_revision = 'b81f06c2d4a9'
+branch_labels = None
+depends_on = None
+
+# users.id, places.id and the columns referencing them were String(60) while
+# every other key and foreign key is String(36); ids are 36-character UUIDs.
+COLUMNS = [
+    ('users', 'id'),
+    ('places', 'id'),
+    ('places', 'owner_id'),
+    ('place_location_trigram', 'place_id'),
+]
+
+
+def _resize(old, new):
+    mysql = op.get_bind().dialect.name == 'mysql'
+    if mysql:
+        # MySQL refuses to modify key columns that foreign keys point at
+        op.execute('SET FOREIGN_KEY_CHECKS = 0')
+    for table, column in COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.String(length=old),
+                                  type_=sa.String(length=new), existing_nullable=False)
+    if mysql:
+        op.execute('SET FOREIGN_KEY_CHECKS = 1')
+
+
+def upgrade():
+    _resize(60, 36)
+
+
+def downgrade():
+    _resize(36, 60)
@@ -0,0 +1,31 @@
+"""Place timestamps
+
+Revision ID: 70aa2af013ed
+Revises: 955da2ca2e62
+Create Date: 2026-10-18 13:40:26.311870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '70aa2af013ed'
+down_revision = '955da2ca2e62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing places get the migration time so they carry valid validators
+    op.execute("UPDATE places SET created_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,62 @@
+"""Place geo cell
+
+Revision ID: 955da2ca2e62
+Revises: ee39791bb5a3
+Create Date: 2026-10-18 12:21:07.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '955da2ca2e62'
+down_revision = 'ee39791bb5a3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+CELL_DEGREES = 0.1
+LAT_CELLS = 1800
+LON_CELLS = 3600
+
+
+def _cell_id(lat, lon):
+    # Frozen copy of app.geo.cell_id
+    if lat is None or lon is None:
+        return None
+    row = min(max(int((lat + 90) / CELL_DEGREES), 0), LAT_CELLS - 1)
+    col = min(max(int((lon + 180) / CELL_DEGREES), 0), LON_CELLS - 1)
+    return row * LON_CELLS + col
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geo_cell', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_places_geo_cell'), ['geo_cell'], unique=False)
+
+    # Backfill places that already have coordinates, in primary-key batches
+    conn = op.get_bind()
+    places = sa.table('places', sa.column('id'), sa.column('latitude'),
+                      sa.column('longitude'), sa.column('geo_cell'))
+    last_id = ''
+    while True:
+        batch = conn.execute(
+            sa.select(places.c.id, places.c.latitude, places.c.longitude)
+            .where(places.c.id > last_id, places.c.latitude.isnot(None), places.c.longitude.isnot(None))
+            .order_by(places.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not batch:
+            break
+        conn.execute(
+            places.update().where(places.c.id == sa.bindparam('place_id')),
+            [{"place_id": pid, "geo_cell": _cell_id(lat, lon)} for pid, lat, lon in batch]
+        )
+        last_id = batch[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_places_geo_cell'))
+        batch_op.drop_column('geo_cell')
@@ -0,0 +1,47 @@
+"""Place normalized location
+
+Revision ID: a7d3e5f19c42
+Revises: 5e27c9f0a813
+Create Date: 2026-10-18 21:04:52.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5f19c42'
+down_revision = '5e27c9f0a813'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('location_normalized', sa.String(length=128), nullable=True))
+
+    # Backfill in Python, where lower() folds non-ASCII characters too
+    conn = op.get_bind()
+    places = sa.table('places', sa.column('id'), sa.column('location'), sa.column('location_normalized'))
+    last_id = ''
+    while True:
+        batch = conn.execute(
+            sa.select(places.c.id, places.c.location)
+            .where(places.c.id > last_id)
+            .order_by(places.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not batch:
+            break
+        conn.execute(
+            places.update().where(places.c.id == sa.bindparam('place_id')),
+            [{"place_id": pid, "location_normalized": (location or '').lower()} for pid, location in batch]
+        )
+        last_id = batch[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_column('location_normalized')
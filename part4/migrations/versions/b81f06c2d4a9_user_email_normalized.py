@@ -0,0 +1,62 @@
+"""User normalized email
+
+Revision ID: b81f06c2d4a9
+Revises: 3c9a41d7e2b8
+Create Date: 2026-10-18 18:31:09.742115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f06c2d4a9'
+down_revision = '3c9a41d7e2b8'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_normalized', sa.String(length=128), nullable=True))
+
+    # Backfill in primary-key batches so no single statement locks the table
+    conn = op.get_bind()
+    users = sa.table('users', sa.column('id'), sa.column('email'), sa.column('email_normalized'))
+    last_id = ''
+    while True:
+        batch = conn.execute(
+            sa.select(users.c.id, users.c.email)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not batch:
+            break
+        conn.execute(
+            users.update().where(users.c.id == sa.bindparam('user_id')),
+            [{"user_id": uid, "email_normalized": (email or '').strip().lower()} for uid, email in batch]
+        )
+        last_id = batch[-1][0]
+
+    duplicates = conn.execute(
+        sa.select(users.c.email_normalized)
+        .group_by(users.c.email_normalized)
+        .having(sa.func.count() > 1)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Emails differing only by case or whitespace must be merged first: %s"
+            % ", ".join(duplicates[:20]))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('email_normalized', existing_type=sa.String(length=128), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_email_normalized'), ['email_normalized'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email_normalized'))
+        batch_op.drop_column('email_normalized')
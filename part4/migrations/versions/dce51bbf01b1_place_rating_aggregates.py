@@ -0,0 +1,48 @@
+"""Place rating aggregates
+
+Revision ID: dce51bbf01b1
+Revises: 4e684e71b1bf
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dce51bbf01b1'
+down_revision = '4e684e71b1bf'
+branch_labels = None
+depends_on = None
+
+COUNT_COLUMNS = ['review_count', 'rating_sum'] + ['rating_%d_count' % r for r in range(1, 6)]
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        for name in COUNT_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('avg_rating', sa.Float(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_places_avg_rating_id', ['avg_rating', 'id'], unique=False)
+
+    # Backfill from existing reviews (same statement as `flask rebuild-ratings`)
+    histogram = ",\n".join(
+        "rating_{0}_count = (SELECT COALESCE(SUM(CASE WHEN r.rating = {0} THEN 1 ELSE 0 END), 0) "
+        "FROM review r WHERE r.place_id = places.id)".format(rating)
+        for rating in range(1, 6)
+    )
+    op.execute(
+        "UPDATE places SET "
+        "review_count = (SELECT COUNT(r.id) FROM review r WHERE r.place_id = places.id), "
+        "rating_sum = (SELECT COALESCE(SUM(r.rating), 0) FROM review r WHERE r.place_id = places.id), "
+        "avg_rating = (SELECT COALESCE(AVG(r.rating), 0) FROM review r WHERE r.place_id = places.id), "
+        + histogram
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_avg_rating_id')
+        batch_op.drop_column('avg_rating')
+        for name in reversed(COUNT_COLUMNS):
+            batch_op.drop_column(name)
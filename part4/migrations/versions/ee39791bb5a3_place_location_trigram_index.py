@@ -0,0 +1,62 @@
+"""Place location trigram index
+
+Revision ID: ee39791bb5a3
+Revises: dce51bbf01b1
+Create Date: 2026-10-18 11:03:52.570931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ee39791bb5a3'
+down_revision = 'dce51bbf01b1'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _trigrams(text):
+    # Frozen copy of app.models.place_location_trigram.location_trigrams
+    text = (text or '').lower()
+    padded = text + '  '
+    return {padded[i:i + 3] for i in range(len(text))}
+
+
+def upgrade():
+    trigram_table = op.create_table('place_location_trigram',
+    sa.Column('trigram', sa.String(length=3), nullable=False),
+    sa.Column('place_id', sa.String(length=60), nullable=False),
+    sa.ForeignKeyConstraint(['place_id'], ['places.id'], ),
+    sa.PrimaryKeyConstraint('trigram', 'place_id')
+    )
+    op.create_index('ix_place_location_trigram_place_id', 'place_location_trigram', ['place_id'], unique=False)
+
+    # Backfill existing places in primary-key batches
+    conn = op.get_bind()
+    places = sa.table('places', sa.column('id'), sa.column('location'))
+    last_id = ''
+    while True:
+        batch = conn.execute(
+            sa.select(places.c.id, places.c.location)
+            .where(places.c.id > last_id)
+            .order_by(places.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not batch:
+            break
+        rows = [
+            {"trigram": trigram, "place_id": place_id}
+            for place_id, location in batch
+            for trigram in _trigrams(location)
+        ]
+        if rows:
+            op.bulk_insert(trigram_table, rows)
+        last_id = batch[-1][0]
+
+
+def downgrade():
+    op.drop_index('ix_place_location_trigram_place_id', table_name='place_location_trigram')
+    op.drop_table('place_location_trigram')
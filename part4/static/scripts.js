@@ -142,26 +142,40 @@ document.addEventListener('DOMContentLoaded', () => {
   // INDEX PAGE (PLACES LIST)
   // ---------------------------
   if (document.getElementById('places-list')) {
-    fetch('http://127.0.0.1:5000/api/v1/places/')
-      .then(response => response.json())
-      .then(places => {
-        displayPlaces(places);
-
-        // Setup price filter
-        const priceSelect = document.getElementById('max-price');
-        priceSelect.addEventListener('change', () => {
-          const selected = priceSelect.value;
-          let filtered = places;
-          if (selected !== 'All') {
-            const max = parseFloat(selected);
-            filtered = places.filter(place => place.price <= max);
-          }
-          displayPlaces(filtered);
-        });
-      })
-      .catch(error => {
-        document.getElementById('places-list').innerHTML = `<p>Error loading places: ${error.message}</p>`;
-      });
+    const places = [];
+    const priceSelect = document.getElementById('max-price');
+
+    function displayFiltered() {
+      const selected = priceSelect.value;
+      let filtered = places;
+      if (selected !== 'All') {
+        const max = parseFloat(selected);
+        filtered = places.filter(place => place.price <= max);
+      }
+      displayPlaces(filtered);
+    }
+
+    // The list is paginated: follow the `next` cursors until the last page,
+    // showing each page as it arrives. The filter applies to all of them.
+    async function fetchAllPlaces() {
+      let cursor = null;
+      do {
+        const url = new URL('http://127.0.0.1:5000/api/v1/places/');
+        url.searchParams.set('limit', '100');
+        if (cursor) url.searchParams.set('cursor', cursor);
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(response.statusText);
+        const data = await response.json();
+        places.push(...(data.places || []));
+        displayFiltered();
+        cursor = data.next;
+      } while (cursor);
+    }
+
+    priceSelect.addEventListener('change', displayFiltered);
+    fetchAllPlaces().catch(error => {
+      document.getElementById('places-list').innerHTML = `<p>Error loading places: ${error.message}</p>`;
+    });
     return;
   }
 
@@ -338,7 +352,7 @@ function displayPlaceDetails(place) {
     <p><strong>Country:</strong> ${place.country || 'Unknown'}</p>
     <p><strong>Price per night:</strong> $${place.price || place.price_per_night || 0}</p>
     <p><strong>Description:</strong> ${place.description || ''}</p>
-    <p><strong>Amenities:</strong> ${Array.isArray(place.amenities) ? place.amenities.join(', ') : (place.amenities || '')}</p>
+    <p><strong>Amenities:</strong> ${Array.isArray(place.amenities) ? place.amenities.map(a => a.name || a).join(', ') : (place.amenities || '')}</p>
   `;
 }
 
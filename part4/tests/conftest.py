@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import config as app_config, create_app
+from app.extensions import db
+from app.identity import identity_claims
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+@pytest.fixture
+def settings():
+    """Config overrides for the app fixture; override it in a test module."""
+    return {}
+
+
+@pytest.fixture
+def app(settings, monkeypatch):
+    config_name = 'TestingConfig'
+    if settings:
+        config_name = 'OverriddenTestingConfig'
+        monkeypatch.setattr(app_config, config_name,
+                            type(config_name, (app_config.TestingConfig,), settings), raising=False)
+    app = create_app(config_name)
+    with app.app_context():
+        # Only the primary: the models have no bind key, and once an app
+        # has declared a replica bind, db knows a metadata for it too.
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Authorization headers for ``user``, with the claims login issues."""
+    def headers(user):
+        token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
+        return {'Authorization': 'Bearer ' + token}
+    return headers
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting the SQL statements run inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counter
+
+
+@pytest.fixture
+def make_user(app):
+    def make(**fields):
+        fields.setdefault('first_name', 'Test')
+        fields.setdefault('last_name', 'User')
+        fields.setdefault('email', 'user-%d@example.com' % User.query.count())
+        fields.setdefault('password', 'x')
+        user = User(**fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_place(app, make_user):
+    def make(**fields):
+        if 'owner_id' not in fields:
+            fields['owner_id'] = make_user().id
+        fields.setdefault('name', 'Place')
+        fields.setdefault('price', 100.0)
+        place = Place(**fields)
+        db.session.add(place)
+        db.session.commit()
+        return place
+    return make
+
+
+@pytest.fixture
+def make_review(app, make_user):
+    def make(place, rating=4, **fields):
+        if 'user_id' not in fields:
+            fields['user_id'] = make_user().id
+        fields.setdefault('text', 'Nice stay')
+        review = Review(place_id=place.id, rating=rating, **fields)
+        db.session.add(review)
+        Place.apply_rating_change(place.id, added=rating)
+        db.session.commit()
+        return review
+    return make
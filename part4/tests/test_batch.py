@@ -0,0 +1,100 @@
+import pytest
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+
+@pytest.fixture
+def owner_headers(auth_headers, make_user):
+    return auth_headers(make_user())
+
+
+@pytest.fixture
+def admin_headers(auth_headers, make_user):
+    return auth_headers(make_user(is_admin=True))
+
+
+def statuses(response):
+    return [(r['index'], r['status']) for r in response.get_json()['results']]
+
+
+@pytest.mark.parametrize('path', ['/api/v1/places/batch', '/api/v1/amenities/batch', '/api/v1/reviews/batch'])
+def test_empty_batch_is_rejected(client, admin_headers, path):
+    response = client.post(path, json=[], headers=admin_headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'msg': 'Body must be a non-empty JSON array'}
+
+
+def test_places_batch_reports_each_item_in_request_order(client, owner_headers):
+    items = [
+        {'name': 'Loft', 'price': 80},
+        {'name': 'Flat', 'price': 50, 'bogus': 1},
+        5,
+        {'name': '', 'price': 10},
+        {'name': 'Cabin', 'price': 120, 'location': 'Zurich'},
+    ]
+    response = client.post('/api/v1/places/batch', json=items, headers=owner_headers)
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 3)
+    assert statuses(response) == [(0, 201), (1, 400), (2, 400), (3, 400), (4, 201)]
+    results = body['results']
+    assert results[1]['errors'] == {'bogus': ['Unknown field.']}
+    assert results[2]['errors'] == {'_schema': ['Invalid input type.']}
+    assert 'name' in results[3]['errors']
+    assert Place.query.get(results[0]['id']).name == 'Loft'
+    assert Place.query.get(results[4]['id']).name == 'Cabin'
+
+
+def test_places_batch_with_only_invalid_items_is_400(client, owner_headers):
+    response = client.post('/api/v1/places/batch', json=[None, {'price': 1}], headers=owner_headers)
+    assert response.status_code == 400
+    assert statuses(response) == [(0, 400), (1, 400)]
+    assert Place.query.count() == 0
+
+
+def test_amenities_batch_rejects_duplicates_within_the_batch_and_the_table(client, admin_headers):
+    client.post('/api/v1/amenities/', json={'name': 'Pool'}, headers=admin_headers)
+    items = [{'name': 'Wifi'}, {'name': 'Wifi'}, {'name': 'Pool'}, {'name': 'Sauna', 'x': 1}, 'Gym', {'name': 'Gym'}]
+    response = client.post('/api/v1/amenities/batch', json=items, headers=admin_headers)
+    assert response.status_code == 207
+    assert statuses(response) == [(0, 201), (1, 400), (2, 400), (3, 400), (4, 400), (5, 201)]
+    results = response.get_json()['results']
+    assert results[1]['errors'] == results[2]['errors'] == {'name': ['Amenity already exists']}
+    assert results[3]['errors'] == {'x': ['Unknown field.']}
+    assert results[4]['errors'] == {'_schema': ['Invalid input type.']}
+    assert sorted(a.name for a in Amenity.query) == ['Gym', 'Pool', 'Wifi']
+
+
+def test_amenities_batch_is_admin_only(client, owner_headers):
+    response = client.post('/api/v1/amenities/batch', json=[{'name': 'Wifi'}], headers=owner_headers)
+    assert response.status_code == 403
+
+
+def test_reviews_batch_applies_the_single_review_rules(client, auth_headers, make_place, make_review, make_user):
+    reviewer = make_user()
+    place, other, own, reviewed = make_place(), make_place(), make_place(owner=reviewer), make_place()
+    make_review(reviewed, user=reviewer)
+    items = [
+        {'place_id': place.id, 'text': 'Great', 'rating': 5},
+        {'place_id': place.id, 'text': 'Again', 'rating': 1},
+        {'place_id': other.id, 'text': 'Fine', 'rating': 3, 'ignored': True},
+        None,
+        {'place_id': 'missing', 'text': 'Nope', 'rating': 2},
+        {'place_id': own.id, 'text': 'Mine', 'rating': 5},
+        {'place_id': reviewed.id, 'text': 'Twice', 'rating': 5},
+        {'place_id': other.id, 'text': 'Bad', 'rating': 9},
+    ]
+    response = client.post('/api/v1/reviews/batch', json=items, headers=auth_headers(reviewer))
+    assert response.status_code == 207
+    assert statuses(response) == [(0, 201), (1, 400), (2, 201), (3, 400), (4, 400), (5, 400), (6, 400), (7, 400)]
+    errors = [r.get('errors') for r in response.get_json()['results']]
+    assert errors[1] == {'place_id': ['Already reviewed this place']}
+    assert errors[3] == {'_schema': ['Invalid input type.']}
+    assert errors[4] == {'place_id': ['Place not found']}
+    assert errors[5] == {'place_id': ['Cannot review your own place']}
+    assert errors[6] == {'place_id': ['Already reviewed this place']}
+    assert 'rating' in errors[7]
+    assert Review.query.filter_by(user_id=reviewer.id).count() == 3
+    assert client.get('/api/v1/places/%s' % place.id).get_json()['rating_histogram']['5'] == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from app.extensions import db
+from app.models.amenity import Amenity
+
+
+@pytest.fixture
+def place(make_place, make_review):
+    place = make_place()
+    place.amenities.append(Amenity(name='Wifi'))
+    db.session.commit()
+    make_review(place)
+    return place
+
+
+def _etag(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    return response.headers['ETag']
+
+
+@pytest.mark.parametrize('path', [
+    '/api/v1/places/{id}', '/api/v1/places/{id}/reviews', '/api/v1/places/?limit=5',
+])
+def test_if_none_match_returns_304(client, place, path):
+    path = path.format(id=place.id)
+    etag = _etag(client, path)
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.get_data() == b''
+    assert client.get(path, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_etag_changes_after_place_update(client, auth_headers, place):
+    path = '/api/v1/places/%s' % place.id
+    etag = _etag(client, path)
+    response = client.put(path, json={'name': 'Renamed'}, headers=auth_headers(place.owner))
+    assert response.status_code == 200
+    assert _etag(client, path) != etag
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_etag_changes_after_review_writes(client, auth_headers, make_user, place):
+    paths = ['/api/v1/places/%s' % place.id, '/api/v1/places/%s/reviews' % place.id]
+    before = [_etag(client, path) for path in paths]
+    reviewer = make_user()
+    response = client.post('/api/v1/places/%s/reviews/' % place.id, json={'text': 'Great', 'rating': 5},
+                           headers=auth_headers(reviewer))
+    assert response.status_code == 201
+    after_create = [_etag(client, path) for path in paths]
+    assert all(a != b for a, b in zip(after_create, before))
+
+    response = client.delete('/api/v1/reviews/%s' % response.get_json()['id'], headers=auth_headers(reviewer))
+    assert response.status_code == 200
+    after_delete = [_etag(client, path) for path in paths]
+    assert all(a != b for a, b in zip(after_delete, after_create))
+
+
+def test_etag_changes_after_amenity_update(client, auth_headers, make_user, place):
+    path = '/api/v1/places/%s' % place.id
+    etag = _etag(client, path)
+    admin = make_user(is_admin=True)
+    amenity = place.amenities.first()
+    response = client.put('/api/v1/amenities/%s' % amenity.id, json={'name': 'Fast wifi'},
+                          headers=auth_headers(admin))
+    assert response.status_code == 200
+    assert _etag(client, path) != etag
@@ -0,0 +1,36 @@
+from app.extensions import db
+from app.models.amenity import Amenity
+
+
+def test_place_detail_without_parameters_keeps_its_shape(client, make_place, make_review):
+    place = make_place()
+    make_review(place)
+    body = client.get('/api/v1/places/%s' % place.id).get_json()
+    assert {'amenities', 'reviews', 'host'} <= set(body)
+
+
+def test_place_detail_fields_without_include_embeds_nothing(client, make_place, make_review):
+    place = make_place()
+    place.amenities.append(Amenity(name='Wifi'))
+    db.session.commit()
+    make_review(place)
+    response = client.get('/api/v1/places/%s' % place.id, query_string={'fields': 'name,price'})
+    assert response.status_code == 200
+    assert response.get_json() == {'id': place.id, 'name': 'Place', 'price': 100.0}
+
+
+def test_place_detail_fields_with_include(client, make_place, make_review):
+    place = make_place()
+    make_review(place)
+    body = client.get('/api/v1/places/%s' % place.id,
+                      query_string={'fields': 'name', 'include': 'reviews'}).get_json()
+    assert set(body) == {'id', 'name', 'reviews'}
+    assert len(body['reviews']) == 1
+
+
+def test_review_fields_emit_only_what_was_requested(client, make_place, make_review):
+    place = make_place()
+    make_review(place)
+    for path in ('/api/v1/places/%s/reviews', '/api/v1/places/%s/reviews/'):
+        body = client.get(path % place.id, query_string={'fields': 'user_name'}).get_json()
+        assert [set(review) for review in body] == [{'id', 'user_name'}]
@@ -0,0 +1,31 @@
+from app.extensions import db
+
+
+def test_writes_authorize_from_token_claims_without_loading_the_user(client, count_queries, auth_headers, make_user):
+    owner = make_user()
+    headers = auth_headers(owner)
+    with count_queries() as statements:
+        response = client.post('/api/v1/places/', json={'name': 'Loft', 'price': 80}, headers=headers)
+    assert response.status_code == 201
+    assert response.get_json()['owner_id'] == owner.id
+    assert not [s for s in statements if 'FROM users' in s]
+
+
+def test_review_author_name_comes_from_the_token(client, auth_headers, make_place, make_user):
+    place = make_place()
+    reviewer = make_user(first_name='Ada', last_name='L')
+    response = client.post('/api/v1/places/%s/reviews/' % place.id, json={'text': 'Great', 'rating': 5},
+                           headers=auth_headers(reviewer))
+    assert response.status_code == 201
+    assert response.get_json()['user_name'] == 'Ada L'
+
+
+def test_admin_checks_use_the_is_admin_claim(client, auth_headers, make_user):
+    user = make_user()
+    headers = auth_headers(user)
+    assert client.post('/api/v1/amenities/', json={'name': 'Pool'}, headers=headers).status_code == 403
+    # Promotion takes effect with the next token, not the one already issued
+    user.is_admin = True
+    db.session.commit()
+    assert client.post('/api/v1/amenities/', json={'name': 'Pool'}, headers=headers).status_code == 403
+    assert client.post('/api/v1/amenities/', json={'name': 'Pool'}, headers=auth_headers(user)).status_code == 201
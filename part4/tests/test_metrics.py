@@ -0,0 +1,52 @@
+from app import create_app
+from app import config as app_config
+
+
+class MetricsOffConfig(app_config.TestingConfig):
+    METRICS_ENABLED = False
+
+
+class MetricsTokenConfig(app_config.TestingConfig):
+    METRICS_BEARER_TOKEN = 'secret'
+
+
+def test_metrics_counts_requests_by_route(client):
+    client.get('/api/v1/amenities/missing')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/amenities/<string:amenity_id>",status="404"}' in body
+    assert 'route="/metrics"' not in body
+
+
+def test_metrics_endpoint_is_off_unless_enabled(monkeypatch):
+    monkeypatch.setattr(app_config, 'MetricsOffConfig', MetricsOffConfig, raising=False)
+    app = create_app('MetricsOffConfig')
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_token(monkeypatch):
+    monkeypatch.setattr(app_config, 'MetricsTokenConfig', MetricsTokenConfig, raising=False)
+    client = create_app('MetricsTokenConfig').test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_metrics_label_children_are_resolved_per_endpoint_and_method(app, client):
+    metrics = app.extensions['metrics']
+    client.get('/api/v1/amenities/missing')
+    # The first request resolved every route of the URL map
+    route = metrics._routes['amenities.get_amenity', 'GET']
+    assert route.labels == ('GET', '/api/v1/amenities/<string:amenity_id>')
+    assert metrics._routes['places.create_place', 'POST'].labels == ('POST', '/api/v1/places/')
+    assert metrics._routes['metrics.metrics', 'GET'] is None
+
+    client.get('/api/v1/amenities/other')
+    assert metrics._routes['amenities.get_amenity', 'GET'] is route
+
+
+def test_unmatched_requests_share_one_route_label(client):
+    client.get('/no/such/page')
+    client.get('/nor/this/one')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",route="<unmatched>",status="404"}' in body
+    assert '/no/such/page' not in body
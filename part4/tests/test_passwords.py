@@ -0,0 +1,38 @@
+from app.extensions import db, password_hasher
+from app.models.user import User
+
+
+def _login(client, email, password):
+    return client.post('/api/v1/login/', json={'email': email, 'password': password})
+
+
+def _cost(user_id):
+    db.session.expire_all()
+    return int(db.session.get(User, user_id).password.split('$')[2])
+
+
+def test_login_rehashes_when_the_work_factor_changes(client, make_user, monkeypatch):
+    user = make_user(email='ada@example.com')
+    user.set_password('correct horse')
+    db.session.commit()
+    assert _cost(user.id) == 4
+
+    monkeypatch.setattr(password_hasher, 'rounds', 5)
+    assert _login(client, 'ada@example.com', 'wrong').status_code == 401
+    assert _cost(user.id) == 4
+
+    response = _login(client, 'ada@example.com', 'correct horse')
+    assert response.status_code == 200
+    assert response.get_json()['access_token']
+    assert _cost(user.id) == 5
+    assert _login(client, 'ADA@example.com ', 'correct horse').status_code == 200
+
+
+def test_login_keeps_a_current_hash(client, make_user):
+    user = make_user(email='bob@example.com')
+    user.set_password('secret')
+    db.session.commit()
+    stored = user.password
+    assert _login(client, 'bob@example.com', 'secret').status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user.id).password == stored
@@ -0,0 +1,79 @@
+import pytest
+
+from app.api.v1 import place_amenities
+from app.extensions import db
+from app.models.amenity import Amenity
+
+
+@pytest.fixture
+def amenity_ids():
+    amenities = [Amenity(name='Amenity %d' % i) for i in range(5)]
+    db.session.add_all(amenities)
+    db.session.commit()
+    return [a.id for a in amenities]
+
+
+def attached(client, place):
+    return sorted(a['id'] for a in client.get('/api/v1/places/%s/amenities' % place.id).get_json())
+
+
+@pytest.mark.parametrize('wrap', [lambda ids: ids, lambda ids: {'amenity_ids': ids}], ids=['list', 'object'])
+def test_put_applies_the_difference(client, auth_headers, make_place, amenity_ids, wrap):
+    place = make_place()
+    headers = auth_headers(place.owner)
+    url = '/api/v1/places/%s/amenities' % place.id
+    response = client.put(url, json=wrap(amenity_ids[:3]), headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'amenity_ids': sorted(amenity_ids[:3]), 'added': sorted(amenity_ids[:3]), 'removed': []}
+
+    response = client.put(url, json=wrap(amenity_ids[1:]), headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'amenity_ids': sorted(amenity_ids[1:]), 'added': sorted(amenity_ids[3:]), 'removed': [amenity_ids[0]]}
+    assert attached(client, place) == sorted(amenity_ids[1:])
+
+    response = client.put(url, json=wrap([]), headers=headers)
+    assert response.get_json() == {'amenity_ids': [], 'added': [], 'removed': sorted(amenity_ids[1:])}
+    assert attached(client, place) == []
+
+
+@pytest.mark.parametrize('body', [['unknown'], {'amenity_ids': 'x'}, [1], None])
+def test_put_rejects_bad_bodies(client, auth_headers, make_place, amenity_ids, body):
+    place = make_place()
+    response = client.put('/api/v1/places/%s/amenities' % place.id, json=body, headers=auth_headers(place.owner))
+    assert response.status_code == 400
+    assert attached(client, place) == []
+
+
+def test_put_recomputes_the_difference_after_a_conflicting_write(client, auth_headers, make_place, amenity_ids, monkeypatch):
+    place = make_place()
+    headers = auth_headers(place.owner)
+    url = '/api/v1/places/%s/amenities' % place.id
+    client.put(url, json=amenity_ids[:2], headers=headers)
+    real_attached_ids = place_amenities._attached_ids
+    reads = []
+
+    def attached_ids(place_id):
+        # The first read misses the rows already attached, as if a concurrent
+        # PUT had committed them after it, so the INSERT hits the primary key.
+        reads.append(place_id)
+        return set() if len(reads) == 1 else real_attached_ids(place_id)
+    monkeypatch.setattr(place_amenities, '_attached_ids', attached_ids)
+    response = client.put(url, json=amenity_ids[:3], headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['added'] == [amenity_ids[2]]
+    assert len(reads) == 2
+    assert attached(client, place) == sorted(amenity_ids[:3])
+
+
+def test_put_conflicts_when_the_retry_fails_too(client, auth_headers, make_place, amenity_ids, monkeypatch):
+    place = make_place()
+    headers = auth_headers(place.owner)
+    url = '/api/v1/places/%s/amenities' % place.id
+    client.put(url, json=amenity_ids[:2], headers=headers)
+    monkeypatch.setattr(place_amenities, '_attached_ids', lambda place_id: set())
+    response = client.put(url, json=amenity_ids[:3], headers=headers)
+    assert response.status_code == 409
+    monkeypatch.undo()
+    assert attached(client, place) == sorted(amenity_ids[:2])
@@ -0,0 +1,54 @@
+from app.extensions import db
+from app.models.amenity import Amenity
+
+
+def _detail_queries(client, count_queries, place):
+    with count_queries() as statements:
+        response = client.get('/api/v1/places/%s' % place.id)
+    assert response.status_code == 200
+    return len(statements), response.get_json()
+
+
+def test_place_detail_query_count_does_not_grow_with_reviews(client, count_queries, make_place, make_review):
+    place = make_place()
+    place.amenities.append(Amenity(name='Wifi'))
+    db.session.commit()
+    make_review(place)
+    one_review, body = _detail_queries(client, count_queries, place)
+    assert len(body['reviews']) == 1
+
+    for _ in range(24):
+        make_review(place)
+    many_reviews, body = _detail_queries(client, count_queries, place)
+    assert len(body['reviews']) == 25
+    assert all(review['user_name'] == 'Test User' for review in body['reviews'])
+    assert [amenity['name'] for amenity in body['amenities']] == ['Wifi']
+    assert many_reviews == one_review
+
+
+def test_place_review_feed_query_count_does_not_grow_with_reviews(client, count_queries, make_place, make_review):
+    place = make_place()
+    counts = []
+    for total in (1, 25):
+        while place.reviews.count() < total:
+            make_review(place)
+        with count_queries() as statements:
+            response = client.get('/api/v1/places/%s/reviews' % place.id)
+        assert response.status_code == 200
+        assert len(response.get_json()) == total
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+
+def test_review_feeds_of_many_places_are_queried_in_chunks(client, count_queries, make_place, make_review, monkeypatch):
+    monkeypatch.setattr('app.models.review.FEED_CHUNK_SIZE', 2)
+    places = [make_place(location='Zurich %d' % i) for i in range(5)]
+    for place in places:
+        make_review(place)
+    with count_queries() as statements:
+        response = client.get('/api/v1/places/search?location=zurich')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert sorted(p['id'] for p in body) == sorted(p.id for p in places)
+    assert all(len(p['reviews']) == 1 for p in body)
+    assert len([s for s in statements if 'FROM review' in s]) == 3
@@ -0,0 +1,54 @@
+import base64
+import json
+
+import pytest
+
+from app.pagination import encode_cursor
+
+
+def _cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def test_next_cursor_walks_every_place(client, make_place):
+    ids = sorted(make_place(name='Place %d' % i).id for i in range(5))
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/v1/places/', query_string={'limit': 2, 'cursor': cursor} if cursor else {'limit': 2})
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [place['id'] for place in body['places']]
+        cursor = body['next']
+        if cursor is None:
+            break
+    assert seen == ids
+
+
+@pytest.mark.parametrize('sort, values', [
+    ('id', [{}]),
+    ('id', [None]),
+    ('id', [1]),
+    ('id', ['a', 'b']),
+    ('rating', ['4.5', 'a']),
+    ('rating', [True, 'a']),
+    ('rating', [4.5, {}]),
+    ('rating', [None, 'a']),
+])
+def test_crafted_cursor_is_rejected(client, sort, values):
+    response = client.get('/api/v1/places/', query_string={'sort': sort, 'cursor': _cursor(values)})
+    assert response.status_code == 400
+    assert response.get_json() == {'msg': 'Invalid cursor'}
+
+
+def test_non_finite_rating_cursor_is_rejected(client):
+    cursor = base64.urlsafe_b64encode(b'[NaN,"a"]').decode()
+    response = client.get('/api/v1/places/', query_string={'sort': 'rating', 'cursor': cursor})
+    assert response.status_code == 400
+
+
+def test_rating_cursor_accepts_its_own_encoding(client, make_place):
+    place = make_place()
+    response = client.get('/api/v1/places/', query_string={
+        'sort': 'rating', 'cursor': encode_cursor([5, place.id])})
+    assert response.status_code == 200
+    assert [p['id'] for p in response.get_json()['places']] == [place.id]
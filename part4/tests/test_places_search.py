@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.fixture
+def places(make_place):
+    return {
+        'zurich': make_place(name='Loft', location='Zürich Altstadt', latitude=47.37, longitude=8.54),
+        'ny': make_place(name='Flat', location='New York', latitude=40.71, longitude=-74.0),
+    }
+
+
+def _search(client, **args):
+    return client.get('/api/v1/places/search', query_string=args)
+
+
+@pytest.mark.parametrize('term', ['ZÜRICH', 'zür', 'Zü', 'Z'])
+def test_location_search_folds_non_ascii_case(client, places, term):
+    response = _search(client, location=term)
+    assert response.status_code == 200
+    assert [p['id'] for p in response.get_json()] == [places['zurich'].id]
+
+
+@pytest.mark.parametrize('term', ['\U0010ffff', 'n\U0010ffff', 'ne\U0010ffff'])
+def test_location_search_term_ending_in_last_code_point(client, places, term):
+    response = _search(client, location=term)
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+@pytest.mark.parametrize('args', [
+    {'bbox': 'nan,nan,nan,nan'},
+    {'bbox': '0,0,inf,10'},
+    {'bbox': '-190,0,10,10'},
+    {'bbox': '0,-91,10,10'},
+    {'lat': '40', 'lon': '-74', 'radius_km': 'nan'},
+    {'lat': '40', 'lon': '-74', 'radius_km': 'inf'},
+    {'lat': 'nan', 'lon': '-74'},
+    {'lat': '40', 'lon': '-inf'},
+    {'lat': '91', 'lon': '0'},
+    {'lat': '0', 'lon': '181'},
+])
+def test_geo_search_rejects_non_finite_and_out_of_range(client, places, args):
+    response = _search(client, **args)
+    assert response.status_code == 400
+
+
+def test_geo_search_radius_and_bbox(client, places):
+    response = _search(client, lat='40.7', lon='-74', radius_km='50')
+    assert [p['id'] for p in response.get_json()] == [places['ny'].id]
+    response = _search(client, bbox='5,45,10,50')
+    assert [p['id'] for p in response.get_json()] == [places['zurich'].id]
+
+
+@pytest.mark.parametrize('args', [
+    {'min_price': 'nan'}, {'max_price': 'inf'}, {'min_price': '-inf'}, {'max_price': 'cheap'},
+])
+def test_price_filters_reject_non_finite(client, places, args):
+    assert _search(client, **args).status_code == 400
+
+
+def test_price_filters(client, places):
+    response = _search(client, min_price='50', max_price='150')
+    assert sorted(p['id'] for p in response.get_json()) == sorted(p.id for p in places.values())
+    assert _search(client, max_price='50').get_json() == []
@@ -0,0 +1,48 @@
+import importlib.util
+import os
+import types
+
+import pytest
+
+from app import prefork
+from app.prefork import cooperative_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('mysql://u:p%40ss@db:3306/hbnb?charset=utf8mb4', 'mysql+pymysql://u:p%40ss@db:3306/hbnb?charset=utf8mb4'),
+    ('mysql+pymysql://u:p@db/hbnb', 'mysql+pymysql://u:p@db/hbnb'),
+    ('mysql+mysqldb://u:p@db/hbnb', 'mysql+mysqldb://u:p@db/hbnb'),
+    ('sqlite:///hbnb.db', 'sqlite:///hbnb.db'),
+])
+def test_cooperative_url_switches_bare_mysql_urls_to_pymysql(url, expected):
+    assert cooperative_url(url) == expected
+
+
+@pytest.fixture
+def gunicorn_conf(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    monkeypatch.delenv('GUNICORN_WORKER_CLASS', raising=False)
+    spec = importlib.util.spec_from_file_location(
+        'gunicorn_conf', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # As if loaded with GUNICORN_WORKER_CLASS=gevent, without patching this process
+    module.worker_class = 'gevent'
+    return module
+
+
+def fake_worker(app, warnings):
+    log = types.SimpleNamespace(warning=lambda msg, *args: warnings.append(msg % args))
+    return types.SimpleNamespace(app=types.SimpleNamespace(wsgi=lambda: app), log=log)
+
+
+def test_gevent_worker_boots_on_sqlite_with_a_warning(app, gunicorn_conf):
+    warnings = []
+    gunicorn_conf.post_fork(None, fake_worker(app, warnings))
+    assert warnings == ['Database driver pysqlite blocks the gevent loop during queries']
+
+
+def test_gevent_worker_refuses_to_boot_on_other_blocking_drivers(app, gunicorn_conf, monkeypatch):
+    monkeypatch.setattr(prefork, 'TOLERATED_BLOCKING_DRIVERS', set())
+    with pytest.raises(RuntimeError, match='pysqlite would block the gevent loop'):
+        gunicorn_conf.post_fork(None, fake_worker(app, []))
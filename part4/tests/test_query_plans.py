@@ -0,0 +1,28 @@
+import pytest
+
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.query_plans import check_query_plans
+
+
+@pytest.fixture
+def seeded(app, make_place, make_review):
+    for i in range(3):
+        place = make_place(name='Place %d' % i, location='New York %d' % i,
+                           latitude=40.7 + i / 100, longitude=-74.0, price=20 + i)
+        place.amenities.append(Amenity(name='Amenity %d' % i))
+        db.session.commit()
+        make_review(place)
+        make_review(place)
+
+
+def test_read_endpoints_do_not_scan_indexed_tables(app, seeded):
+    problems = check_query_plans(app)
+    assert problems == [], '\n'.join('%s: full scan of %s' % (path, table) for path, table, _ in problems)
+
+
+def test_missing_index_is_reported(app, seeded):
+    db.session.execute(db.text('DROP INDEX ix_review_place_id_created_at'))
+    db.session.commit()
+    problems = check_query_plans(app)
+    assert 'review' in {table for _, table, _ in problems}
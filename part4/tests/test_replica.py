@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+WINDOW = 0.3
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'primary.db'),
+        'SQLALCHEMY_BINDS': {'replica': 'sqlite:///%s' % (tmp_path / 'replica.db')},
+        'DB_REPLICA_READ_YOUR_WRITES_SECONDS': WINDOW,
+    }
+
+
+@pytest.fixture
+def sync_replica(app):
+    def sync():
+        result = app.test_cli_runner().invoke(args=['sync-sqlite-replica'])
+        assert result.exit_code == 0, result.output
+    return sync
+
+
+def place_names(client, headers=None):
+    response = client.get('/api/v1/places/', headers=headers or {})
+    assert response.status_code == 200
+    return [p['name'] for p in response.get_json()['places']]
+
+
+def test_writer_reads_from_the_primary_within_the_window(client, auth_headers, make_user, sync_replica):
+    owner = make_user()
+    headers = auth_headers(owner)
+    sync_replica()
+    assert client.post('/api/v1/places/', json={'name': 'Loft', 'price': 80}, headers=headers).status_code == 201
+
+    # The replica has not caught up: everyone else still reads from it,
+    # while the writer sees their own write on the primary.
+    assert place_names(client) == []
+    assert place_names(client, headers) == ['Loft']
+
+    time.sleep(WINDOW + 0.05)
+    assert place_names(client, headers) == []
+    sync_replica()
+    assert place_names(client, headers) == place_names(client) == ['Loft']
+
+
+def test_failed_writes_keep_reads_on_the_replica(client, auth_headers, make_user, make_place, sync_replica):
+    owner = make_user()
+    headers = auth_headers(owner)
+    sync_replica()
+    make_place(owner=owner, name='Unsynced')
+    assert client.post('/api/v1/places/', json={'name': ''}, headers=headers).status_code == 400
+    assert place_names(client, headers) == []
@@ -0,0 +1,71 @@
+import pytest
+
+from app.extensions import db, response_cache
+from app.models.amenity import Amenity
+
+
+@pytest.fixture
+def settings():
+    return {'RESPONSE_CACHE_BACKEND': 'lru', 'RESPONSE_CACHE_TTL': 300}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(app):
+    response_cache.clear()
+
+
+def _cached(client, count_queries, path):
+    """Whether GET ``path`` was answered without touching the database."""
+    with count_queries() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return not statements
+
+
+def test_second_get_is_served_from_cache(client, count_queries, make_place):
+    path = '/api/v1/places/%s' % make_place().id
+    assert not _cached(client, count_queries, path)
+    assert _cached(client, count_queries, path)
+
+
+def test_review_write_invalidates_only_its_place(client, count_queries, auth_headers, make_place, make_user):
+    place, other = make_place(), make_place()
+    paths = {p: '/api/v1/places/%s' % p.id for p in (place, other)}
+    for path in paths.values():
+        client.get(path)
+    response = client.post('/api/v1/places/%s/reviews/' % place.id, json={'text': 'Great', 'rating': 5},
+                           headers=auth_headers(make_user()))
+    assert response.status_code == 201
+    assert not _cached(client, count_queries, paths[place])
+    assert len(client.get(paths[place]).get_json()['reviews']) == 1
+    assert _cached(client, count_queries, paths[other])
+
+
+def test_user_rename_invalidates_feeds_showing_the_name(client, count_queries, auth_headers,
+                                                        make_place, make_review, make_user):
+    place = make_place()
+    author = make_user(first_name='Ada', last_name='L')
+    make_review(place, user_id=author.id)
+    path = '/api/v1/places/%s/reviews?fields=user_name' % place.id
+    assert client.get(path).get_json()[0]['user_name'] == 'Ada L'
+    assert _cached(client, count_queries, path)
+
+    response = client.put('/api/v1/users/%s' % author.id, json={'first_name': 'Grace'},
+                          headers=auth_headers(author))
+    assert response.status_code == 200
+    assert not _cached(client, count_queries, path)
+    assert client.get(path).get_json()[0]['user_name'] == 'Grace L'
+
+
+def test_amenity_update_invalidates_places_embedding_it(client, count_queries, auth_headers,
+                                                        make_place, make_user):
+    place = make_place()
+    amenity = Amenity(name='Wifi')
+    place.amenities.append(amenity)
+    db.session.commit()
+    path = '/api/v1/places/%s?include=amenities' % place.id
+    client.get(path)
+    response = client.put('/api/v1/amenities/%s' % amenity.id, json={'name': 'Fast wifi'},
+                          headers=auth_headers(make_user(is_admin=True)))
+    assert response.status_code == 200
+    assert [a['name'] for a in client.get(path).get_json()['amenities']] == ['Fast wifi']
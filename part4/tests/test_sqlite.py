@@ -0,0 +1,34 @@
+import pytest
+
+from app.extensions import db
+from app.sqlite import DEFAULT_PRAGMAS
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return {'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'hbnb.db')}
+
+
+def pragma(connection, name):
+    return connection.exec_driver_sql('PRAGMA %s' % name).scalar()
+
+
+def test_file_database_connections_get_the_pragmas(app):
+    # Two connections at once: the pragmas are set on every new connection,
+    # not once per database.
+    with db.engine.connect() as first, db.engine.connect() as second:
+        for connection in (first, second):
+            assert pragma(connection, 'journal_mode') == 'wal'
+            assert pragma(connection, 'busy_timeout') == DEFAULT_PRAGMAS['busy_timeout']
+            assert pragma(connection, 'synchronous') == 1  # NORMAL
+            assert pragma(connection, 'temp_store') == 2  # MEMORY
+            assert pragma(connection, 'cache_size') == DEFAULT_PRAGMAS['cache_size']
+
+
+def test_optimize_command_truncates_the_wal(app, make_place, tmp_path):
+    make_place()
+    wal = tmp_path / 'hbnb.db-wal'
+    assert wal.stat().st_size > 0
+    result = app.test_cli_runner().invoke(args=['sqlite-optimize'])
+    assert result.exit_code == 0, result.output
+    assert wal.stat().st_size == 0
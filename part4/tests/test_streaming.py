@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models.amenity import Amenity
+
+
+@pytest.fixture
+def settings():
+    # Small chunks so the streams cross several chunk boundaries
+    return {'STREAM_CHUNK_SIZE': 2}
+
+
+def streamed(client, url, headers=None):
+    response = client.get(url, headers=headers or {})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/json'
+    return json.loads(response.get_data(as_text=True))
+
+
+@pytest.mark.parametrize('count', [0, 1, 4, 5])
+def test_streamed_place_list_is_valid_json_and_matches_the_pages(client, make_place, count):
+    for i in range(count):
+        make_place(name='Place "%d"' % i, location='Zürich', price=10 + i)
+    body = streamed(client, '/api/v1/places/?stream=1')
+    assert body == client.get('/api/v1/places/?limit=100').get_json()
+    assert len(body['places']) == count and body['next'] is None
+
+
+def test_streamed_rating_order_matches_the_pages(client, make_place, make_review):
+    for rating in (3, 5, 1):
+        make_review(make_place(), rating=rating)
+    body = streamed(client, '/api/v1/places/?stream=1&sort=rating')
+    assert body['places'] == client.get('/api/v1/places/?limit=100&sort=rating').get_json()['places']
+
+
+def test_streamed_search_is_valid_json(client, make_place):
+    for i in range(5):
+        make_place(location='New York %d' % i, latitude=40.7, longitude=-74 + i * 0.01)
+    make_place(location='Far away', latitude=10, longitude=10)
+    body = streamed(client, '/api/v1/places/search?lat=40.7&lon=-74&radius_km=10&stream=1')
+    assert len(body) == 5
+    assert all(place['distance_km'] < 10 for place in body)
+    assert streamed(client, '/api/v1/places/search?location=nowhere&stream=1') == []
+
+
+def test_streamed_amenities_and_users_are_valid_json(client, auth_headers, make_user):
+    db.session.add_all([Amenity(name='Amenity %d' % i, description='"quoted"\n') for i in range(3)])
+    db.session.commit()
+    amenities = streamed(client, '/api/v1/amenities/?stream=1')
+    assert sorted(a['name'] for a in amenities) == ['Amenity 0', 'Amenity 1', 'Amenity 2']
+
+    admin = make_user(is_admin=True)
+    for _ in range(2):
+        make_user()
+    headers = auth_headers(admin)
+    users = streamed(client, '/api/v1/users/?stream=1', headers)
+    assert sorted(u['id'] for u in users) == sorted(u['id'] for u in client.get('/api/v1/users/', headers=headers).get_json())
@@ -0,0 +1,12 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+HBNB_CONFIG selects the config class (default ProductionConfig); run.py
+stays the development server.
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('HBNB_CONFIG', 'ProductionConfig'))